@@ -0,0 +1,128 @@
+"""
+Import-time budget for the app and for `import llm`.
+
+Each target is imported in a fresh interpreter under `python -X importtime`; the
+cumulative time of its imports (interpreter startup excluded) must stay within
+budget, and none of the heavy dependencies may be loaded yet. Streamlit itself
+is not counted for the app, only the modules `streamlit_app.py` imports.
+
+Usage:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --runs 10 --budget app=400 --budget llm=250
+"""
+
+import argparse
+import ast
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Loaded on first use only; importing any of them at startup costs up to a second
+HEAVY_MODULES = ("langchain_core", "langchain_ollama", "ollama", "pypdf", "jinja2")
+
+DEFAULT_BUDGETS_MS = {"llm": 250.0, "app": 400.0}
+
+_MARKER = "-- imports start --"
+
+
+def app_modules() -> list[str]:
+    """The top-level modules `streamlit_app.py` imports, except Streamlit itself."""
+    tree = ast.parse((ROOT / "streamlit_app.py").read_text(encoding="utf-8"))
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            if name.split(".")[0] != "streamlit" and name not in modules:
+                modules.append(name)
+    return modules
+
+
+def measure(modules: list[str]) -> tuple[float, list[str]]:
+    """Milliseconds spent importing `modules`, and the heavy modules they loaded."""
+    code = (
+        f"import sys; sys.stderr.write({_MARKER!r} + '\\n'); sys.stderr.flush()\n"
+        f"import {', '.join(modules)}\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total_us = 0
+    started = False
+    for line in completed.stderr.splitlines():
+        if line == _MARKER:
+            started = True
+            continue
+        if not started or not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # Nested imports are indented and already part of their parent's time
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+
+    heavy = [name for name in completed.stdout.strip().split(",") if name]
+    return total_us / 1000, heavy
+
+
+def parse_budget(value: str) -> tuple[str, float]:
+    target, _, milliseconds = value.partition("=")
+    if target not in DEFAULT_BUDGETS_MS or not milliseconds:
+        raise argparse.ArgumentTypeError(
+            f"expected one of {', '.join(DEFAULT_BUDGETS_MS)} followed by =<ms>"
+        )
+    return target, float(milliseconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import-time budget.")
+    parser.add_argument("--runs", type=int, default=5, help="Best of this many runs")
+    parser.add_argument(
+        "--budget",
+        type=parse_budget,
+        action="append",
+        default=[],
+        metavar="TARGET=MS",
+        help="Override a budget, e.g. app=400",
+    )
+    args = parser.parse_args()
+    budgets = DEFAULT_BUDGETS_MS | dict(args.budget)
+
+    failures = []
+    for target, modules in (("llm", ["llm"]), ("app", app_modules())):
+        runs = [measure(modules) for _ in range(args.runs)]
+        milliseconds = min(run[0] for run in runs)
+        heavy = sorted({name for run in runs for name in run[1]})
+
+        print(
+            f"{target:<5} {milliseconds:>8.1f} ms  (budget {budgets[target]:.0f} ms)"
+            + (f"  loads {', '.join(heavy)}" if heavy else "")
+        )
+        if milliseconds > budgets[target]:
+            failures.append(
+                f"{target}: {milliseconds:.1f} ms > {budgets[target]:.0f} ms"
+            )
+        if heavy:
+            failures.append(f"{target}: imports {', '.join(heavy)} at startup")
+
+    if failures:
+        print("Import-time budget exceeded:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("Within the import-time budget")
+
+
+if __name__ == "__main__":
+    main()
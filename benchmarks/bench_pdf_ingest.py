@@ -0,0 +1,88 @@
+"""
+Compare the old two-pass PDF reading (annotation walk + PyPDFLoader) with the
+single-pass `pdf_ingest.extract_pdf`.
+
+Usage:
+    python benchmarks/bench_pdf_ingest.py temp/cv.pdf --pages 1 5 20 --iterations 20
+"""
+
+import argparse
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pypdf import PdfReader, PdfWriter
+from pdf_ingest import extract_pdf
+
+
+def build_pdf(source: Path, pages: int) -> bytes:
+    """Repeat the pages of `source` until the document has `pages` pages."""
+    reader = PdfReader(source)
+    writer = PdfWriter()
+    while len(writer.pages) < pages:
+        for page in reader.pages:
+            if len(writer.pages) >= pages:
+                break
+            writer.add_page(page)
+
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def two_pass(pdf_bytes: bytes) -> None:
+    from langchain_community.document_loaders import PyPDFLoader
+
+    # The upload had to be copied to disk for PyPDFLoader
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as f:
+        f.write(pdf_bytes)
+        f.flush()
+
+        pdf_reader = PdfReader(f.name)
+        url_annotations = []
+        for page in pdf_reader.pages:
+            if "/Annots" in page:
+                for annot in page["/Annots"]:  # type: ignore
+                    subtype = annot.get_object()["/Subtype"]
+                    if subtype == "/Link":
+                        if "/A" in annot.get_object():
+                            uri = annot.get_object()["/A"].get("/URI", None)
+                            if uri:
+                                url_annotations.append(uri)
+
+        docs = PyPDFLoader(f.name).load_and_split()
+        "\n".join([doc.page_content for doc in docs])
+
+
+def single_pass(pdf_bytes: bytes) -> None:
+    extract_pdf(pdf_bytes)
+
+
+def measure(fn, pdf_bytes: bytes, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(pdf_bytes)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("pdf", type=Path, help="CV PDF to build test documents from")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'two-pass ms':>12} {'single-pass ms':>15} {'speedup':>8}")
+    for pages in args.pages:
+        pdf_bytes = build_pdf(args.pdf, pages)
+        old = measure(two_pass, pdf_bytes, args.iterations)
+        new = measure(single_pass, pdf_bytes, args.iterations)
+        print(f"{pages:>6} {old * 1000:>12.2f} {new * 1000:>15.2f} {old / new:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Offline throughput benchmark of the CV pipeline.
+
+The LLM is replaced by `ReplayChatModel`, so this measures the pipeline's own
+overhead (prompt building, output parsing, validation, rendering, concurrency)
+plus the configured fake model latency, over synthetic CVs of increasing size.
+
+Results are compared against a stored baseline; the run fails if any
+benchmark's throughput dropped by more than `--threshold`.
+
+Usage:
+    python benchmarks/bench_pipeline.py --sizes 2x3 8x5 32x8 --iterations 10
+    python benchmarks/bench_pipeline.py --update-baseline
+    python benchmarks/bench_pipeline.py --latency 0.05 --seconds-per-token 0.0005
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_llm import (
+    CannedResponder,
+    ReplayChatModel,
+    synthetic_cv,
+    synthetic_cv_text,
+)
+from cache import DiskCache
+from cv_generator import _with_personal_info
+from cv_renderer import render_cv_to_string
+from instrumentation import metrics, ollama_metrics_callback
+from llm import LLM
+from models import RawCV
+from persistence import atomic_write_text
+from relevance import score_cv
+
+
+DEFAULT_BASELINE_PATH = Path(__file__).parent / "baselines" / "pipeline.json"
+# A benchmark regresses when its throughput drops by more than this fraction
+DEFAULT_THRESHOLD = 0.2
+
+JOB_DESCRIPTION = (
+    "We are looking for a senior backend engineer with Python, Kubernetes and "
+    "PostgreSQL experience to scale our data platform."
+)
+USER_STORY = "I enjoy building reliable systems and mentoring engineers."
+
+
+def parse_size(value: str) -> tuple[int, int]:
+    experiences, _, bullets = value.partition("x")
+    return int(experiences), int(bullets or 3)
+
+
+def measure(fn: Callable[[], object], iterations: int, repeats: int) -> float:
+    """
+    Runs per second of `fn`, after one warm-up call.
+
+    The best of `repeats` rounds of `iterations` calls is kept, since noise
+    only ever makes a round slower.
+    """
+    fn()
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return iterations / best
+
+
+def stage_report() -> dict[str, float]:
+    """Mean milliseconds per stage since the last `metrics.reset()`."""
+    return {
+        name: round(metrics.stage_seconds[name] / count * 1000, 3)
+        for name, count in sorted(metrics.stage_count.items())
+        if count
+    }
+
+
+def run_benchmarks(args: argparse.Namespace) -> dict[str, float]:
+    results = {}
+
+    for experiences, bullets in args.sizes:
+        size = f"{experiences}x{bullets}"
+        cv = synthetic_cv(experiences, bullets)
+        model = ReplayChatModel(
+            respond=CannedResponder(cv),
+            latency=args.latency,
+            seconds_per_token=args.seconds_per_token,
+            callbacks=[ollama_metrics_callback()],
+        )
+        with tempfile.TemporaryDirectory() as cache_dir:
+            llm = LLM(
+                model_name="replay",
+                cv_cache=DiskCache(cache_dir, enabled=False),
+                chat_model=model,
+            )
+            raw_cv = RawCV(pages=[synthetic_cv_text(cv)], links=[])
+            base_cv = cv.into_cv()
+            job_descriptions = [
+                f"{JOB_DESCRIPTION} Team {i}." for i in range(args.batch_size)
+            ]
+
+            async def generate_batch():
+                async for _, result in llm.generate_cv_batch(
+                    base_cv,
+                    job_descriptions,
+                    USER_STORY,
+                    max_concurrency=args.concurrency,
+                    use_cache=False,
+                ):
+                    if isinstance(result, Exception):
+                        raise result
+
+            benchmarks = {
+                "parse": lambda: llm.parse_cv_with_personal_info(raw_cv),
+                "generate": lambda: _with_personal_info(
+                    llm.generate_cv(
+                        USER_STORY, JOB_DESCRIPTION, base_cv, use_cache=False
+                    ),
+                    cv,
+                ),
+                "generate_sections": lambda: llm.generate_cv_by_sections(
+                    USER_STORY, JOB_DESCRIPTION, base_cv, use_cache=False
+                ),
+                "stream": lambda: list(
+                    llm.stream_cv(
+                        USER_STORY, JOB_DESCRIPTION, base_cv, use_cache=False
+                    )
+                ),
+                # Counted per CV, so it compares directly with "generate"
+                "generate_batch": lambda: asyncio.run(generate_batch()),
+                "render": lambda: render_cv_to_string(cv),
+                "relevance": lambda: score_cv(cv, JOB_DESCRIPTION),
+            }
+
+            for name, fn in benchmarks.items():
+                if args.only and name not in args.only:
+                    continue
+                metrics.reset()
+                per_second = measure(fn, args.iterations, args.repeats)
+                if name == "generate_batch":
+                    per_second *= args.batch_size
+                key = f"{name}/{size}"
+                results[key] = per_second
+                if not args.quiet:
+                    print(
+                        f"{key:<28} {per_second:>10.1f}/s  "
+                        f"stages (ms): {stage_report()}"
+                    )
+
+    return results
+
+
+def check_regressions(
+    results: dict[str, float], baseline: dict[str, float], threshold: float
+) -> list[str]:
+    regressions = []
+    for key, per_second in results.items():
+        expected = baseline.get(key)
+        if expected and per_second < expected * (1 - threshold):
+            regressions.append(
+                f"{key}: {per_second:.1f}/s vs baseline {expected:.1f}/s "
+                f"({per_second / expected - 1:+.0%})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--sizes",
+        type=parse_size,
+        nargs="+",
+        default=[(2, 3), (8, 5), (32, 8)],
+        help="CV sizes as <experiences>x<bullets per experience>",
+    )
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Fake model seconds per reply"
+    )
+    parser.add_argument(
+        "--seconds-per-token",
+        type=float,
+        default=0.0,
+        help="Fake model seconds per generated token",
+    )
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--only", nargs="+", help="Run only these benchmarks, e.g. parse render"
+    )
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store these results as the new baseline instead of checking them",
+    )
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args)
+
+    if args.update_baseline:
+        baseline = (
+            json.loads(args.baseline.read_text(encoding="utf-8"))
+            if args.baseline.exists()
+            else {}
+        )
+        baseline.update({key: round(value, 3) for key, value in results.items()})
+        atomic_write_text(
+            args.baseline, json.dumps(baseline, indent=2, sort_keys=True) + "\n"
+        )
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline first")
+        return
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = check_regressions(results, baseline, args.threshold)
+    if regressions:
+        print(f"Throughput regressed by more than {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
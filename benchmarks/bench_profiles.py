@@ -0,0 +1,95 @@
+"""
+Compare model profiles (reasoning mode, schema-constrained output) against a
+running Ollama server: seconds, generated tokens and parse failures per CV.
+
+Usage:
+    python benchmarks/bench_profiles.py base_cv.json job.txt --model deepseek-r1:14b \
+        --reasoning default off --structured both --runs 3
+"""
+
+import argparse
+import itertools
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cache import DiskCache
+from instrumentation import metrics
+from llm import DEFAULT_MODEL_NAME, LLM, get_model_profile
+from models import CVWithPersonalInfo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare model profiles on Ollama.")
+    parser.add_argument("base_cv", type=Path, help="CVWithPersonalInfo JSON file")
+    parser.add_argument("job_description", type=Path, help="Job description text file")
+    parser.add_argument("--user-story", type=Path, help="User story text file")
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument(
+        "--reasoning",
+        nargs="+",
+        default=["default", "off"],
+        choices=["default", "on", "off", "low", "medium", "high"],
+    )
+    parser.add_argument("--structured", choices=["on", "off", "both"], default="both")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    base_cv = CVWithPersonalInfo.model_validate_json(args.base_cv.read_bytes())
+    job_description = args.job_description.read_text(encoding="utf-8")
+    user_story = (
+        args.user_story.read_text(encoding="utf-8") if args.user_story else ""
+    )
+    structured_options = {"on": [True], "off": [False], "both": [True, False]}[
+        args.structured
+    ]
+
+    print(
+        f"{'reasoning':<10} {'schema':<7} {'s/CV':>8} {'tokens/CV':>10} "
+        f"{'tokens/s':>9} {'failures':>9}"
+    )
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for reasoning, structured in itertools.product(
+            args.reasoning, structured_options
+        ):
+            profile = get_model_profile(args.model).model_copy(
+                update={"reasoning": reasoning, "structured_output": structured}
+            )
+            llm = LLM(
+                model_name=args.model,
+                cv_cache=DiskCache(cache_dir, enabled=False),
+                profile=profile,
+            )
+            llm.warm_up()
+
+            metrics.reset()
+            failures = 0
+            start = time.perf_counter()
+            for _ in range(args.runs):
+                try:
+                    llm.generate_cv(
+                        user_story, job_description, base_cv.into_cv(), use_cache=False
+                    )
+                except Exception as e:
+                    failures += 1
+                    print(f"  failed: {e!r:.200}")
+            seconds = (time.perf_counter() - start) / args.runs
+
+            tokens = sum(metrics.completion_tokens.values()) / args.runs
+            eval_seconds = sum(metrics.eval_seconds.values())
+            tokens_per_second = (
+                sum(metrics.completion_tokens.values()) / eval_seconds
+                if eval_seconds
+                else 0.0
+            )
+            print(
+                f"{reasoning:<10} {'on' if structured else 'off':<7} {seconds:>8.1f} "
+                f"{tokens:>10.0f} {tokens_per_second:>9.1f} {failures:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Throughput and failover of the Ollama endpoint router, against local stand-in
+Ollama servers that each process one request at a time.
+
+Tailors a batch of CVs through one endpoint, then through all of them, and
+finally stops one server halfway through a batch and restarts it, checking that
+no request fails and that the restarted server receives requests again.
+
+Usage:
+    python benchmarks/bench_router.py --endpoints 3 --requests 24 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_llm import CannedResponder, synthetic_cv
+from fake_ollama import FakeOllamaServer
+from cache import DiskCache
+from llm import LLM
+from llm_router import OllamaRouter
+from models import OllamaEndpoint
+
+MODEL = "stand-in:latest"
+JOB_DESCRIPTION = "Senior Python engineer for distributed data pipelines."
+
+
+def run_batch(
+    llm: LLM, base_cv, requests: int, concurrency: int
+) -> tuple[float, int]:
+    async def batch() -> int:
+        failures = 0
+        async for _, result in llm.generate_cv_batch(
+            base_cv,
+            [f"{JOB_DESCRIPTION} Team {i}." for i in range(requests)],
+            "",
+            max_concurrency=concurrency,
+            use_cache=False,
+        ):
+            if isinstance(result, Exception):
+                failures += 1
+                print(f"  failed: {result!r:.200}")
+        return failures
+
+    start = time.perf_counter()
+    failures = asyncio.run(batch())
+    return time.perf_counter() - start, failures
+
+
+def report(name: str, seconds: float, requests: int, failures: int, router):
+    served = ", ".join(
+        f"{stats['served']}{'' if stats['healthy'] else ' (down)'}"
+        for stats in router.stats()
+    )
+    print(
+        f"{name:<24} {requests / seconds:>7.2f} CV/s  failures {failures}  "
+        f"served per endpoint: {served}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the endpoint router.")
+    parser.add_argument("--endpoints", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=24)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--latency", type=float, default=0.2, help="Seconds per request per server"
+    )
+    args = parser.parse_args()
+
+    cv = synthetic_cv(4, 4)
+    base_cv = cv.into_cv()
+    servers = [
+        FakeOllamaServer(CannedResponder(cv), MODEL, latency=args.latency).start()
+        for _ in range(args.endpoints)
+    ]
+
+    def make_llm(count: int, cache_dir: str) -> tuple[LLM, OllamaRouter]:
+        router = OllamaRouter(
+            model=MODEL,
+            endpoints=[
+                OllamaEndpoint(url=server.url, max_concurrency=1)
+                for server in servers[:count]
+            ],
+            health_check_interval=0.2,
+        )
+        llm = LLM(
+            model_name=MODEL,
+            cv_cache=DiskCache(cache_dir, enabled=False),
+            chat_model=router,
+        )
+        return llm, router
+
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for count in sorted({1, args.endpoints}):
+                llm, router = make_llm(count, cache_dir)
+                seconds, failures = run_batch(
+                    llm, base_cv, args.requests, args.concurrency
+                )
+                report(f"{count} endpoint(s)", seconds, args.requests, failures, router)
+                router.close()
+
+            llm, router = make_llm(args.endpoints, cache_dir)
+            expected = args.requests * args.latency / args.endpoints
+            restarted = servers[0]
+            stop = threading.Timer(expected / 3, restarted.stop)
+            restart = threading.Timer(expected * 2 / 3, restarted.start)
+            stop.start()
+            restart.start()
+            served_before = restarted.requests
+            seconds, failures = run_batch(
+                llm, base_cv, args.requests * 2, args.concurrency
+            )
+            restart.join()
+            report("restart mid-batch", seconds, args.requests * 2, failures, router)
+
+            # The restarted server must be back in rotation
+            router.check_health()
+            requests_before = restarted.requests
+            run_batch(llm, base_cv, args.endpoints * 2, args.concurrency)
+            rejoined = restarted.requests > requests_before
+            print(
+                f"restarted endpoint served {requests_before - served_before} "
+                f"request(s) during the batch; rejoined the pool: {rejoined}"
+            )
+            router.close()
+            if failures or not rejoined:
+                sys.exit(1)
+    finally:
+        for server in servers:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Measure semantic cache lookups against an index of synthetic job descriptions,
+and check that reposts are found while unrelated postings are not.
+
+Usage:
+    python benchmarks/bench_semantic_cache.py --entries 20000 --queries 500
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_llm import synthetic_cv
+from semantic_cache import REUSE_THRESHOLD, SemanticCache
+
+VOCABULARY = (
+    "python go rust java kubernetes terraform aws gcp azure postgresql kafka "
+    "spark airflow react typescript backend frontend platform data machine "
+    "learning infrastructure reliability security api microservices distributed "
+    "systems team lead senior staff engineer manager scale latency throughput "
+    "observability testing ci cd mentoring product startup remote hybrid berlin "
+    "london payments search ads growth analytics streaming storage networking"
+).split()
+
+BOILERPLATE = (
+    "We offer a competitive salary, flexible hours and a friendly team. "
+    "We are an equal opportunity employer. Apply now!"
+)
+
+
+def job_description(rng: random.Random) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(80, 200)))
+
+
+def repost(text: str, rng: random.Random) -> str:
+    """The same posting with different boilerplate and a few edited words."""
+    words = text.split()
+    for _ in range(max(1, len(words) // 100)):
+        words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+    return f"Join us! {' '.join(words)} {BOILERPLATE}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark semantic cache lookups.")
+    parser.add_argument("--entries", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cv = synthetic_cv(4, 4)
+    context = "benchmark"
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SemanticCache(Path(directory) / "semantic_cache.sqlite3")
+        descriptions = [job_description(rng) for _ in range(args.entries)]
+
+        start = time.perf_counter()
+        for description in descriptions:
+            cache.add(context, description, cv)
+        insert_seconds = time.perf_counter() - start
+        print(
+            f"Indexed {len(cache)} entries in {insert_seconds:.1f}s "
+            f"({insert_seconds / args.entries * 1000:.2f} ms each)"
+        )
+
+        for label, make_query in (
+            ("repost", lambda: repost(rng.choice(descriptions), rng)),
+            ("unrelated", lambda: job_description(rng)),
+        ):
+            latencies = []
+            found = reused = 0
+            for _ in range(args.queries):
+                query = make_query()
+                start = time.perf_counter()
+                match = cache.query(context, query)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if match is not None:
+                    found += 1
+                    reused += match.similarity >= REUSE_THRESHOLD
+            latencies.sort()
+            print(
+                f"{label:<10} p50 {statistics.median(latencies):.2f} ms  "
+                f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.2f} ms  "
+                f"found {found}/{args.queries}  reused {reused}/{args.queries}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Micro-benchmark of CV serialization: loading JSON, dumping it, and converting
+between CVWithPersonalInfo and CV, each against the dict-based path it replaces.
+
+Usage:
+    python benchmarks/bench_serialization.py --sizes 8x5 64x10 256x20
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydantic import TypeAdapter
+from fake_llm import synthetic_cv
+from models import CV, CVWithPersonalInfo
+from serialization import dump_json, load_cv, load_json
+
+
+def parse_size(value: str) -> tuple[int, int]:
+    experiences, _, bullets = value.partition("x")
+    return int(experiences), int(bullets)
+
+
+def dumped_into_cv(cv: CVWithPersonalInfo) -> CV:
+    return CV.model_validate(cv.model_dump(include=set(CV.model_fields)))
+
+
+def dumped_from_cv(cv: CV, personal: CVWithPersonalInfo) -> CVWithPersonalInfo:
+    personal_info = personal.model_dump(
+        include={"full_name", "email", "phone", "links"}
+    )
+    return CVWithPersonalInfo.model_validate(cv.model_dump() | personal_info)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CV serialization.")
+    parser.add_argument(
+        "--sizes",
+        type=parse_size,
+        nargs="+",
+        default=[(8, 5), (64, 10), (256, 20)],
+        help="CV sizes as <experiences>x<bullets per experience>",
+    )
+    parser.add_argument("--repeats", type=int, default=5, help="Best of this many")
+    args = parser.parse_args()
+
+    for experiences, bullets in args.sizes:
+        cv = synthetic_cv(experiences, bullets)
+        text = cv.model_dump_json()
+        data = text.encode("utf-8")
+        cvs_data = dump_json([cv] * 10, list[CVWithPersonalInfo])
+        # Aim for roughly 0.2 s per measurement
+        number = max(1, int(2_000_000 / len(data)))
+
+        cases = {
+            "load: json.loads + CV(**dict)": lambda: CVWithPersonalInfo(
+                **json.loads(data)
+            ),
+            "load: model_validate_json": lambda: load_json(data, CVWithPersonalInfo),
+            "load: load_cv (repeated text)": lambda: load_cv(data),
+            "load list: new TypeAdapter": lambda: TypeAdapter(
+                list[CVWithPersonalInfo]
+            ).validate_json(cvs_data),
+            "load list: cached TypeAdapter": lambda: load_json(
+                cvs_data, list[CVWithPersonalInfo]
+            ),
+            "dump: json.dumps(model_dump())": lambda: json.dumps(
+                cv.model_dump(), ensure_ascii=False
+            ).encode("utf-8"),
+            "dump: dump_json": lambda: dump_json(cv),
+            "into_cv: model_dump + validate": lambda: dumped_into_cv(cv),
+            "into_cv": lambda: cv.into_cv(),
+            "from_cv: model_dump + validate": lambda: dumped_from_cv(cv, cv),
+            "from_cv": lambda: CVWithPersonalInfo.from_cv(
+                cv, cv.full_name, cv.email, cv.phone, cv.links
+            ),
+        }
+
+        print(f"{experiences}x{bullets} ({len(data) / 1024:.0f} KiB)")
+        for name, function in cases.items():
+            seconds = min(timeit.repeat(function, number=number, repeat=args.repeats))
+            print(f"  {name:<34} {seconds / number * 1e6:>10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+A deterministic stand-in for ChatOllama plus synthetic CVs, so the pipeline can be
+benchmarked without an Ollama server or model weights.
+
+`ReplayChatModel` answers every prompt with `respond(prompt)` after a configurable
+delay and reports the same usage metadata Ollama does. `CannedResponder` produces
+valid JSON for each of the prompts the `LLM` class sends.
+"""
+
+import asyncio
+import json
+import sys
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from models import CV, CVHeader, CVWithPersonalInfo
+from prompt_encoding import estimate_tokens
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Replies with `respond(prompt text)`.
+
+    Each reply takes `latency` seconds plus `seconds_per_token` for every generated
+    token (estimated from its length), and streams in chunks of `chunk_chars`.
+    """
+
+    respond: Callable[[str], str]
+    latency: float = 0.0
+    seconds_per_token: float = 0.0
+    chunk_chars: int = 16
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _reply(self, messages: list[BaseMessage]) -> tuple[str, dict[str, Any]]:
+        prompt = "\n".join(message.text for message in messages)
+        text = self.respond(prompt)
+        completion_tokens = estimate_tokens(text)
+        # Same keys and units (nanoseconds) as Ollama's response metadata
+        metadata = {
+            "model": "replay",
+            "prompt_eval_count": estimate_tokens(prompt),
+            "eval_count": completion_tokens,
+            "prompt_eval_duration": 0,
+            "eval_duration": int(
+                (self.latency + self.seconds_per_token * completion_tokens) * 1e9
+            ),
+            "load_duration": 0,
+        }
+        return text, metadata
+
+    def _delay(self, text: str) -> float:
+        return self.latency + self.seconds_per_token * estimate_tokens(text)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text, metadata = self._reply(messages)
+        time.sleep(self._delay(text))
+        message = AIMessage(content=text, response_metadata=metadata)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        text, metadata = self._reply(messages)
+        await asyncio.sleep(self._delay(text))
+        message = AIMessage(content=text, response_metadata=metadata)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunks(
+        self, text: str, metadata: dict[str, Any]
+    ) -> Iterator[ChatGenerationChunk]:
+        for start in range(0, len(text), self.chunk_chars):
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(content=text[start : start + self.chunk_chars])
+            )
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(content="", response_metadata=metadata)
+        )
+
+    def _stream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> Iterator[ChatGenerationChunk]:
+        text, metadata = self._reply(messages)
+        time.sleep(self.latency)
+        for chunk in self._chunks(text, metadata):
+            time.sleep(self.seconds_per_token * estimate_tokens(chunk.text))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        text, metadata = self._reply(messages)
+        await asyncio.sleep(self.latency)
+        for chunk in self._chunks(text, metadata):
+            await asyncio.sleep(self.seconds_per_token * estimate_tokens(chunk.text))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+def _between(text: str, start: str, end: str) -> str:
+    return text.split(start, 1)[1].split(end, 1)[0].strip()
+
+
+class CannedResponder:
+    """
+    Answers the LLM class's prompts for one CV.
+
+    The parser prompt gets the full CV back. Tailoring prompts echo the CV or
+    section they were given, so the replies grow with the input like real ones.
+    """
+
+    def __init__(self, cv: CVWithPersonalInfo):
+        self.cv_json = cv.model_dump_json()
+
+    def __call__(self, prompt: str) -> str:
+        if "expert CV parser" in prompt:
+            return self.cv_json
+
+        if "Here is the base CV in JSON format:" in prompt:
+            return _between(
+                prompt, "Here is the base CV in JSON format:", "Here is the user story"
+            )
+
+        section = _between(
+            prompt, "Here is the section in JSON format:", "Here is the user story"
+        )
+        if "(title and summary)" in prompt:
+            header = json.loads(section)
+            return CVHeader(
+                title=header["title"], self_summary=header["self_summary"]
+            ).model_dump_json()
+        return section
+
+
+def synthetic_cv(experiences: int, bullets: int) -> CVWithPersonalInfo:
+    """A CV with `experiences` entries of `bullets` bullet points each."""
+    return CVWithPersonalInfo(
+        full_name="Jane Doe",
+        email="jane.doe@example.com",
+        phone="+1 555 0100",
+        links=[
+            CV.Link(label="GitHub", url="https://github.com/janedoe"),
+            CV.Link(label="LinkedIn", url="https://linkedin.com/in/janedoe"),
+        ],
+        title="Senior Software Engineer",
+        self_summary=(
+            "Backend engineer with a focus on distributed systems, data pipelines "
+            "and developer tooling."
+        ),
+        experiences=[
+            CV.Experience(
+                position=f"Software Engineer {i + 1}",
+                company=f"Company {i + 1}",
+                location="Berlin, Germany",
+                start_date=f"{2024 - 2 * i - 2}-01",
+                end_date=f"{2024 - 2 * i}-01",
+                bullets=[
+                    f"Built service {j + 1} handling {1000 * (j + 1)} requests per "
+                    "second with p99 latency under 50 ms"
+                    for j in range(bullets)
+                ],
+                skills=["Python", "PostgreSQL", "Kubernetes"],
+            )
+            for i in range(experiences)
+        ],
+        certificates=[
+            CV.Certificate(
+                name="Cloud Architect",
+                issuer="Cloud Inc.",
+                date="2022-05",
+                link=CV.Link(label="Credential", url="https://example.com/cert"),
+            )
+        ],
+        languages=[
+            CV.LanguageProficiency(language="English", proficiency="C2"),
+            CV.LanguageProficiency(language="German", proficiency="B2"),
+        ],
+        education=[
+            CV.Education(
+                degree="MSc Computer Science",
+                institution="Technical University",
+                start_date="2010-10",
+                end_date="2012-09",
+            )
+        ],
+        skills=[
+            CV.Skill(category="Languages", skills=["Python", "Go", "SQL"]),
+            CV.Skill(category="Infrastructure", skills=["Kubernetes", "Terraform"]),
+        ],
+    )
+
+
+def synthetic_cv_text(cv: CVWithPersonalInfo) -> str:
+    """Plain text of a CV, as PDF extraction would produce it."""
+    lines = [cv.full_name, cv.title, cv.email, cv.phone, cv.self_summary]
+    for experience in cv.experiences:
+        lines.append(
+            f"{experience.position}, {experience.company}, {experience.location} "
+            f"({experience.start_date} - {experience.end_date})"
+        )
+        lines.extend(f"- {bullet}" for bullet in experience.bullets)
+    for skill in cv.skills:
+        lines.append(f"{skill.category}: {', '.join(skill.skills)}")
+    return "\n".join(lines)
@@ -0,0 +1,135 @@
+"""
+A stand-in Ollama HTTP server on localhost, so endpoint routing and failover can
+be exercised with the real Ollama client and no model weights.
+
+`FakeOllamaServer` answers /api/tags, /api/chat and /api/generate. Chat replies
+come from `respond(prompt)`, as with `ReplayChatModel`, and are streamed as
+newline-delimited JSON after `latency` seconds. At most `parallel` requests are
+processed at once; the rest queue, like on a single-GPU Ollama server.
+"""
+
+import json
+import threading
+import time
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from prompt_encoding import estimate_tokens
+
+
+class FakeOllamaServer:
+    def __init__(
+        self,
+        respond: Callable[[str], str],
+        model: str,
+        latency: float = 0.0,
+        parallel: int = 1,
+        port: int = 0,
+        chunk_chars: int = 64,
+    ):
+        self.respond = respond
+        self.model = model
+        self.latency = latency
+        self.chunk_chars = chunk_chars
+        self.port = port
+        self.requests = 0
+        self._slots = threading.Semaphore(parallel)
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> "FakeOllamaServer":
+        """Start serving; after `stop()`, this restarts on the same port."""
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(
+            target=self._server.serve_forever,
+            # Also how long `stop()` may take
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        ).start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving, like a crashed or restarting server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _chat(self, request: dict) -> list[dict]:
+        prompt = "\n".join(message["content"] for message in request["messages"])
+        with self._slots:
+            self.requests += 1
+            text = self.respond(prompt)
+            time.sleep(self.latency)
+
+        lines = [
+            {
+                "model": self.model,
+                "message": {
+                    "role": "assistant",
+                    "content": text[start : start + self.chunk_chars],
+                },
+                "done": False,
+            }
+            for start in range(0, len(text), self.chunk_chars)
+        ]
+        lines.append(
+            {
+                "model": self.model,
+                "message": {"role": "assistant", "content": ""},
+                "done": True,
+                "done_reason": "stop",
+                "prompt_eval_count": estimate_tokens(prompt),
+                "eval_count": estimate_tokens(text),
+                "eval_duration": int(self.latency * 1e9),
+            }
+        )
+        return lines
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send_json_lines(self, lines: list[dict]) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                try:
+                    for line in lines:
+                        self.wfile.write(json.dumps(line).encode("utf-8") + b"\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up on the request, e.g. it was cancelled
+                    pass
+
+            def do_GET(self):
+                if self.path != "/api/tags":
+                    self.send_error(404)
+                    return
+                model = {"name": server.model, "model": server.model}
+                self._send_json_lines([{"models": [model]}])
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/api/chat":
+                    self._send_json_lines(server._chat(request))
+                elif self.path == "/api/generate":
+                    self._send_json_lines([{"model": server.model, "done": True}])
+                else:
+                    self.send_error(404)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,269 @@
+"""
+Parse a directory of CV PDFs into CVWithPersonalInfo JSON files, resumably.
+
+Usage:
+    python bulk_ingest.py cvs/ parsed/
+    python bulk_ingest.py cvs/ parsed/ --workers 4 --concurrency 8
+    CV_OLLAMA_ENDPOINTS=http://gpu1:11434,http://gpu2:11434 \
+        python bulk_ingest.py cvs/ parsed/ --concurrency 4
+
+Text and link annotations are extracted in a process pool, and every extracted
+CV goes on to the LLM as soon as it is ready, with at most `--concurrency`
+parses in flight. Each result is validated and written to
+`<output_dir>/<relative path>.json`, e.g. `parsed/team/a.pdf.json`, and recorded
+in `<output_dir>/manifest.json` along with the SHA-256 of the PDF and the parser
+version. A rerun skips every file the manifest records as done, unless the PDF
+or the parser changed, so an interrupted run resumes where it stopped. Failed
+files are tried again unless `--skip-failed` is given. PDFs whose outputs would
+only differ in case are reported as failed rather than overwriting each other.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+from llm import DEFAULT_MODEL_NAME, LLM, get_llm
+from models import RawCV
+from pdf_ingest import extract_pdf
+from persistence import atomic_write_text
+
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+DEFAULT_CONCURRENCY = 4
+
+
+def find_pdfs(source_dir: Path) -> list[Path]:
+    return sorted(
+        path
+        for path in source_dir.rglob("*")
+        if path.is_file() and path.suffix.lower() == ".pdf"
+    )
+
+
+def output_name(name: str) -> str:
+    # The PDF suffix is kept, so a root-level `manifest.pdf` cannot overwrite the
+    # manifest, and `a.pdf` and `a.PDF` get outputs of their own
+    return f"{name}.json"
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """
+    Which files were ingested, from which content, with which parser.
+
+    Entries are keyed by the PDF's path relative to the source directory. The
+    file is rewritten atomically after every change, so it is never partial.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.files: dict[str, dict[str, Any]] = {}
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.files = data["files"]
+
+    def is_done(
+        self, name: str, sha256: str, parser_version: str, output: str
+    ) -> bool:
+        entry = self.files.get(name)
+        return (
+            entry is not None
+            and entry["status"] == "done"
+            and entry["sha256"] == sha256
+            and entry["parser_version"] == parser_version
+            and entry["output"] == output
+            # A deleted output is produced again
+            and (self.path.parent / entry["output"]).exists()
+        )
+
+    def has_failed(self, name: str, sha256: str) -> bool:
+        entry = self.files.get(name)
+        return (
+            entry is not None
+            and entry["status"] == "failed"
+            and entry["sha256"] == sha256
+        )
+
+    def record(self, name: str, **entry: Any) -> None:
+        self.files[name] = {**entry, "updated_at": time.time()}
+        atomic_write_text(
+            self.path,
+            json.dumps(
+                {"version": MANIFEST_VERSION, "files": self.files},
+                indent=2,
+                ensure_ascii=False,
+            ),
+        )
+
+
+def _extract(path: str) -> RawCV:
+    # Runs in a worker process
+    return extract_pdf(path)
+
+
+async def _ingest_file(
+    llm: LLM,
+    pool: ProcessPoolExecutor,
+    llm_slots: asyncio.Semaphore,
+    path: Path,
+    output_path: Path,
+) -> None:
+    loop = asyncio.get_running_loop()
+    raw_cv = await loop.run_in_executor(pool, _extract, str(path))
+    async with llm_slots:
+        cv = await llm.aparse_cv_with_personal_info(raw_cv)
+    atomic_write_text(output_path, cv.model_dump_json(indent=2))
+
+
+async def ingest(
+    source_dir: str | Path,
+    output_dir: str | Path,
+    workers: int | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    skip_failed: bool = False,
+    llm: LLM | None = None,
+    verbose: bool = True,
+) -> tuple[int, int, list[tuple[str, str]]]:
+    """
+    Parse every PDF under `source_dir` that is not ingested yet.
+
+    Returns the number of files parsed, the number skipped, and a list of
+    `(relative path, error)` pairs for the ones that failed.
+    """
+    source_dir = Path(source_dir)
+    output_dir = Path(output_dir)
+    llm = llm or get_llm(provider="ollama")
+    parser_version = llm.cv_parser_version
+    manifest = Manifest(output_dir / MANIFEST_NAME)
+
+    pending = []
+    skipped = 0
+    failures = []
+    # Keyed case-insensitively, since such file systems would still write two
+    # outputs that differ only in case to the same file
+    claimed = {MANIFEST_NAME.casefold(): MANIFEST_NAME}
+    for path in find_pdfs(source_dir):
+        name = path.relative_to(source_dir).as_posix()
+        output = output_name(name)
+        other = claimed.setdefault(output.casefold(), name)
+        if other != name:
+            error = f"Output {output} collides with that of {other}"
+            failures.append((name, error))
+            print(f"FAILED  {name}: {error}", file=sys.stderr)
+            continue
+
+        sha256 = _sha256(path)
+        if manifest.is_done(name, sha256, parser_version, output) or (
+            skip_failed and manifest.has_failed(name, sha256)
+        ):
+            skipped += 1
+            continue
+        pending.append((name, path, sha256, output))
+
+    parsed = 0
+    start = time.perf_counter()
+    # Extraction runs ahead of the LLM by at most this many files, which bounds
+    # the extracted text held in memory
+    in_flight = asyncio.Semaphore(concurrency + (workers or os.cpu_count() or 1))
+    llm_slots = asyncio.Semaphore(concurrency)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+
+        async def run(name: str, path: Path, sha256: str, output: str) -> None:
+            nonlocal parsed
+            file_start = time.perf_counter()
+            async with in_flight:
+                try:
+                    await _ingest_file(llm, pool, llm_slots, path, output_dir / output)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    failures.append((name, error))
+                    manifest.record(name, status="failed", sha256=sha256, error=error)
+                    print(f"FAILED  {name}: {error}", file=sys.stderr)
+                    return
+
+            parsed += 1
+            manifest.record(
+                name,
+                status="done",
+                sha256=sha256,
+                parser_version=parser_version,
+                output=output,
+            )
+            if verbose:
+                print(f"ok      {name} ({time.perf_counter() - file_start:.1f}s)")
+
+        await asyncio.gather(*(run(*item) for item in pending))
+
+    elapsed = time.perf_counter() - start
+    if verbose:
+        rate = len(pending) / elapsed if elapsed else 0.0
+        print(
+            f"Parsed {parsed}/{len(pending)} CVs in {elapsed:.1f}s "
+            f"({rate:.2f} CVs/s), {len(failures)} failed, {skipped} already done"
+        )
+
+    return parsed, skipped, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Parse a directory of CV PDFs into JSON, resuming earlier runs."
+    )
+    parser.add_argument("source_dir", help="Directory searched for PDFs recursively")
+    parser.add_argument("output_dir", help="Directory for the JSON files and manifest")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of PDF extraction processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="LLM parses in flight; match the capacity of the Ollama endpoints",
+    )
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument(
+        "--skip-failed",
+        action="store_true",
+        help="Do not retry files that failed in an earlier run",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Only report failures")
+    args = parser.parse_args()
+
+    _, _, failures = asyncio.run(
+        ingest(
+            args.source_dir,
+            args.output_dir,
+            workers=args.workers,
+            concurrency=args.concurrency,
+            skip_failed=args.skip_failed,
+            llm=get_llm(provider="ollama", model_name=args.model),
+            verbose=not args.quiet,
+        )
+    )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
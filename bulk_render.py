@@ -0,0 +1,148 @@
+"""
+Render many stored CVs to HTML in parallel.
+
+Usage:
+    python bulk_render.py tailored_cvs/ rendered/
+    python bulk_render.py tailored_cvs.jsonl rendered/ --workers 8 --chunksize 32
+    cat tailored_cvs.jsonl | python bulk_render.py - rendered/
+
+The input is a directory of CVWithPersonalInfo JSON files, a JSON-lines file, or
+`-` for JSON lines on stdin. Every document is validated and rendered to
+`<output_dir>/<name>.html`; invalid documents are reported and skipped.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections.abc import Iterator
+from functools import partial
+from multiprocessing import Pool
+from pathlib import Path
+from models import CVWithPersonalInfo
+from cv_renderer import render_cv_template, warm_up
+
+
+# (document name, JSON text or None, path to read the JSON from or None)
+RenderTask = tuple[str, str | None, str | None]
+# (document name, error message or None, seconds spent)
+RenderResult = tuple[str, str | None, float]
+
+
+def iter_tasks(source: str) -> Iterator[RenderTask]:
+    if source == "-":
+        for line_number, line in enumerate(sys.stdin, start=1):
+            if line.strip():
+                yield f"cv_{line_number:06d}", line, None
+        return
+
+    path = Path(source)
+    if path.is_dir():
+        for json_path in sorted(path.glob("*.json")):
+            # Let the worker read the file so only the path crosses the process boundary
+            yield json_path.stem, None, str(json_path)
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if line.strip():
+                yield f"{path.stem}_{line_number:06d}", line, None
+
+
+def _render_task(task: RenderTask, output_dir: str) -> RenderResult:
+    name, json_text, json_path = task
+    start = time.perf_counter()
+    try:
+        if json_text is None:
+            json_text = Path(json_path).read_text(encoding="utf-8")
+        cv = CVWithPersonalInfo.model_validate_json(json_text)
+        render_cv_template(cv, Path(output_dir) / f"{name}.html")
+    except Exception as e:
+        return name, f"{type(e).__name__}: {e}", time.perf_counter() - start
+    return name, None, time.perf_counter() - start
+
+
+def bulk_render(
+    source: str,
+    output_dir: str | Path,
+    workers: int | None = None,
+    chunksize: int = 16,
+    verbose: bool = True,
+) -> tuple[int, list[tuple[str, str]]]:
+    """
+    Render every CV from `source` into `output_dir` with a process pool.
+
+    Returns the number of documents rendered and a list of `(name, error)` pairs
+    for the ones that failed.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    rendered = 0
+    failures = []
+    start = time.perf_counter()
+
+    render = partial(_render_task, output_dir=str(output_dir))
+    # Each worker compiles the template once up front instead of on its first document
+    with Pool(processes=workers, initializer=warm_up) as pool:
+        # Results are written by the workers and reported as soon as each one is done
+        for name, error, seconds in pool.imap_unordered(
+            render, iter_tasks(source), chunksize=chunksize
+        ):
+            if error is None:
+                rendered += 1
+                if verbose:
+                    print(f"ok      {name} ({seconds * 1000:.1f} ms)")
+            else:
+                failures.append((name, error))
+                print(f"FAILED  {name}: {error}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    total = rendered + len(failures)
+    if verbose:
+        rate = total / elapsed if elapsed else 0.0
+        print(
+            f"Rendered {rendered}/{total} documents in {elapsed:.2f}s "
+            f"({rate:.1f} docs/s), {len(failures)} failed"
+        )
+
+    return rendered, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render stored CVs to HTML in parallel."
+    )
+    parser.add_argument(
+        "source", help="Directory of JSON files, a JSON-lines file, or - for stdin"
+    )
+    parser.add_argument("output_dir", help="Directory to write the HTML files to")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=16,
+        help="Documents dispatched to a worker at a time",
+    )
+    parser.add_argument(
+        "--quiet", action="store_true", help="Only report failures"
+    )
+    args = parser.parse_args()
+
+    _, failures = bulk_render(
+        args.source,
+        args.output_dir,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        verbose=not args.quiet,
+    )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,82 @@
-from models import CVWithPersonalInfo
+import hashlib
+from models import CVWithPersonalInfo, RawCV
 from pathlib import Path
-from pypdf import PdfReader
-
-def analyze_cv_file(cv_path: str, filename: str) -> CVWithPersonalInfo:
-    # TODO: Implement CV parsing logic
-    # Placeholder - will be replaced with actual implementation
-    
-    pdf_reader = PdfReader(cv_path)
-
-    url_annotations = []
-
-    for page in pdf_reader.pages:
-        if "/Annots" in page:
-            for annot in page["/Annots"]:  # type: ignore
-                subtype = annot.get_object()["/Subtype"]
-                if subtype == "/Link":
-                    if "/A" in annot.get_object():
-                        uri = annot.get_object()["/A"].get("/URI", None)
-                        if uri:
-                            url_annotations.append(uri)
-                            
-    raise NotImplementedError(
-        "CV analysis functionality will be implemented using LangChain and file parsing libraries"
+from typing import BinaryIO
+from cache import CACHE_ROOT, DiskCache
+from instrumentation import stage
+from pdf_ingest import extract_pdf
+from llm import cv_parser_version, get_llm
+
+
+PARSED_CV_CACHE_DIR = CACHE_ROOT / "parsed_cv"
+
+parsed_cv_cache = DiskCache(PARSED_CV_CACHE_DIR)
+
+
+def read_cv_file(cv_file: str | Path | bytes | BinaryIO, filename: str) -> RawCV:
+    """Extract the text and link URLs of a CV file. Supports PDF and plain text."""
+    suffix = Path(filename).suffix.lower()
+
+    if suffix == ".pdf":
+        return extract_pdf(cv_file)
+
+    if suffix == ".txt":
+        if isinstance(cv_file, (str, Path)):
+            text = Path(cv_file).read_text(encoding="utf-8")
+        elif isinstance(cv_file, bytes):
+            text = cv_file.decode("utf-8")
+        else:
+            text = cv_file.read().decode("utf-8")
+        return RawCV(pages=[text])
+
+    raise ValueError(f"Unsupported CV file type: {suffix or filename}")
+
+
+def _read_bytes(cv_file: str | Path | bytes | BinaryIO) -> bytes:
+    if isinstance(cv_file, bytes):
+        return cv_file
+    if isinstance(cv_file, (str, Path)):
+        return Path(cv_file).read_bytes()
+    return cv_file.read()
+
+
+def analyze_cv_file(
+    cv_file: str | Path | bytes | BinaryIO, filename: str, use_cache: bool = True
+) -> CVWithPersonalInfo:
+    """
+    Parse a CV file into a CVWithPersonalInfo.
+
+    Results are cached by the SHA-256 of the file contents together with the
+    parser version, so re-uploading the same file skips the LLM, and editing the
+    parser prompt or the CV schema invalidates old entries.
+
+    Args:
+        cv_file: Path to the file, its raw bytes, or an in-memory upload buffer
+        filename: Original file name, used to detect the file type
+        use_cache: Set to False to always re-parse the file
+    """
+    cv_bytes = _read_bytes(cv_file)
+    # Computed from the configuration, so a cache hit needs no reachable Ollama
+    cache_key = DiskCache.make_key(
+        hashlib.sha256(cv_bytes).hexdigest(),
+        Path(filename).suffix.lower(),
+        cv_parser_version(),
     )
+
+    if use_cache:
+        with stage("cache_lookup", cache="parsed_cv"):
+            cached = parsed_cv_cache.get(cache_key)
+        if cached is not None:
+            return CVWithPersonalInfo.model_validate(cached["cv"])
+
+    with stage("analyze_cv", filename=filename):
+        raw_cv = read_cv_file(cv_bytes, filename)
+        parsed_cv = get_llm(provider="ollama").parse_cv_with_personal_info(raw_cv)
+
+    if use_cache:
+        parsed_cv_cache.set(
+            cache_key,
+            {"cv": parsed_cv.model_dump(mode="json"), "links": raw_cv.links},
+        )
+
+    return parsed_cv
@@ -1,21 +1,23 @@
-from models import CVWithPersonalInfo
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any
+from models import CV, CVWithPersonalInfo, RelevanceFilter
 from pathlib import Path
-from llm import LLM
+from cache import DiskCache
+from instrumentation import profiled, stage
+from llm import DEFAULT_MODEL_NAME, DEFAULT_TEMPERATURE, get_llm, get_model_profile
+from relevance import prune_cv
+from semantic_cache import (
+    REUSE_THRESHOLD,
+    WARM_START_THRESHOLD,
+    SemanticMatch,
+    get_semantic_cache,
+)
 
 
-def generate_cv(
-    base_cv: CVWithPersonalInfo, job_description: str, user_story: str
+def _with_personal_info(
+    new_cv: CV, base_cv: CVWithPersonalInfo
 ) -> CVWithPersonalInfo:
-    """Generate a tailored CV based on the base CV and job description."""
-    llm = LLM(provider="ollama")
-
-    new_cv = llm.generate_cv(
-        user_story=user_story,
-        job_description=job_description,
-        base_cv=base_cv.into_cv(),
-    )
-
-    new_cv_with_personal_info = CVWithPersonalInfo.from_cv(
+    return CVWithPersonalInfo.from_cv(
         new_cv,
         full_name=base_cv.full_name,
         email=base_cv.email,
@@ -23,4 +25,184 @@ def generate_cv(
         links=base_cv.links,
     )
 
-    return new_cv_with_personal_info
+
+def _prompt_cv(
+    base_cv: CVWithPersonalInfo,
+    job_description: str,
+    relevance_filter: RelevanceFilter | None,
+) -> CV:
+    """The part of the base CV sent to the LLM."""
+    cv = base_cv.into_cv()
+    if relevance_filter is None:
+        return cv
+    with stage("relevance_filter"):
+        return prune_cv(cv, job_description, relevance_filter)
+
+
+def _semantic_context(
+    base_cv: CVWithPersonalInfo,
+    user_story: str,
+    relevance_filter: RelevanceFilter | None,
+    model_name: str = DEFAULT_MODEL_NAME,
+    temperature: float = DEFAULT_TEMPERATURE,
+) -> str:
+    """Everything besides the job description that shapes a tailored CV.
+
+    Derived from the configuration of the shared LLM rather than the LLM itself,
+    so lookups neither build the chat model nor need a reachable Ollama."""
+    return DiskCache.make_key(
+        model_name,
+        repr(temperature),
+        get_model_profile(model_name).model_dump_json(),
+        base_cv.model_dump_json(),
+        user_story,
+        relevance_filter.model_dump_json() if relevance_filter else "",
+    )
+
+
+def find_similar_cv(
+    base_cv: CVWithPersonalInfo,
+    job_description: str,
+    user_story: str,
+    relevance_filter: RelevanceFilter | None = None,
+    min_similarity: float = WARM_START_THRESHOLD,
+) -> SemanticMatch | None:
+    """The CV tailored earlier to the most similar job description, if it is at
+    least `min_similarity` similar.
+
+    Only CVs generated from the same base CV, user story and settings match."""
+    context = _semantic_context(base_cv, user_story, relevance_filter)
+    with stage("semantic_lookup"):
+        return get_semantic_cache().query(context, job_description, min_similarity)
+
+
+def generate_cv(
+    base_cv: CVWithPersonalInfo,
+    job_description: str,
+    user_story: str,
+    use_cache: bool = True,
+    by_sections: bool = False,
+    profile_to: str | Path | None = None,
+    relevance_filter: RelevanceFilter | None = None,
+    warm_start: CVWithPersonalInfo | None = None,
+    reuse_threshold: float = REUSE_THRESHOLD,
+) -> CVWithPersonalInfo:
+    """Generate a tailored CV based on the base CV and job description.
+
+    Set `use_cache=False` to force a fresh generation, which is not cached either,
+    even if an identical or near-identical request was answered before, and
+    `by_sections=True` to tailor each section with its own concurrent prompt instead
+    of one large completion. With `profile_to`, the call runs under cProfile and its
+    stats are written there. A `relevance_filter` drops content unrelated to the job
+    before prompting. With `warm_start`, a CV tailored to a similar job is sent to
+    the LLM in place of the base CV. A CV tailored earlier to a job description at
+    least `reuse_threshold` similar is returned without generating."""
+    context = _semantic_context(base_cv, user_story, relevance_filter)
+    semantic_cache = get_semantic_cache()
+
+    if use_cache:
+        with stage("semantic_lookup"):
+            match = semantic_cache.query(context, job_description, reuse_threshold)
+        if match is not None:
+            return match.cv
+
+    llm = get_llm(provider="ollama")
+    prompt_base = warm_start or base_cv
+    generate = llm.generate_cv_by_sections if by_sections else llm.generate_cv
+    with profiled(profile_to), stage("generate_cv", by_sections=by_sections):
+        new_cv = generate(
+            user_story=user_story,
+            job_description=job_description,
+            base_cv=_prompt_cv(prompt_base, job_description, relevance_filter),
+            use_cache=use_cache,
+        )
+
+    result = _with_personal_info(new_cv, base_cv)
+    if use_cache:
+        # Filed under the CV it was actually tailored from, so a warm-started
+        # result is never offered later as if the base CV had produced it
+        semantic_cache.add(
+            _semantic_context(prompt_base, user_story, relevance_filter),
+            job_description,
+            result,
+        )
+    return result
+
+
+def stream_cv(
+    base_cv: CVWithPersonalInfo,
+    job_description: str,
+    user_story: str,
+    use_cache: bool = True,
+    relevance_filter: RelevanceFilter | None = None,
+    warm_start: CVWithPersonalInfo | None = None,
+    reuse_threshold: float = REUSE_THRESHOLD,
+) -> Iterator[dict[str, Any] | CVWithPersonalInfo]:
+    """Generate a tailored CV progressively.
+
+    Yields dicts holding the personal info plus every CV section completed so far,
+    suitable for `cv_renderer.render_cv_sections`, and finally the full
+    `CVWithPersonalInfo`. A CV reused for a job description at least
+    `reuse_threshold` similar is yielded at once."""
+    context = _semantic_context(base_cv, user_story, relevance_filter)
+    semantic_cache = get_semantic_cache()
+
+    if use_cache:
+        with stage("semantic_lookup"):
+            match = semantic_cache.query(context, job_description, reuse_threshold)
+        if match is not None:
+            yield match.cv
+            return
+
+    llm = get_llm(provider="ollama")
+    prompt_base = warm_start or base_cv
+    personal_info = {
+        "full_name": base_cv.full_name,
+        "email": base_cv.email,
+        "phone": base_cv.phone,
+        "links": base_cv.links,
+    }
+
+    for update in llm.stream_cv(
+        user_story=user_story,
+        job_description=job_description,
+        base_cv=_prompt_cv(prompt_base, job_description, relevance_filter),
+        use_cache=use_cache,
+    ):
+        if isinstance(update, CV):
+            result = _with_personal_info(update, base_cv)
+            if use_cache:
+                semantic_cache.add(
+                    _semantic_context(prompt_base, user_story, relevance_filter),
+                    job_description,
+                    result,
+                )
+            yield result
+        else:
+            yield personal_info | update
+
+
+async def generate_cv_batch(
+    base_cv: CVWithPersonalInfo,
+    job_descriptions: Sequence[str],
+    user_story: str,
+    max_concurrency: int = 4,
+    timeout: float | None = None,
+    use_cache: bool = True,
+) -> AsyncIterator[tuple[int, CVWithPersonalInfo | Exception]]:
+    """Tailor the base CV to each job description, yielding `(index, result)`
+    pairs as they complete. Failed or timed-out items yield the exception."""
+    llm = get_llm(provider="ollama")
+
+    async for index, result in llm.generate_cv_batch(
+        base_cv=base_cv.into_cv(),
+        job_descriptions=job_descriptions,
+        user_story=user_story,
+        max_concurrency=max_concurrency,
+        timeout=timeout,
+        use_cache=use_cache,
+    ):
+        if isinstance(result, Exception):
+            yield index, result
+        else:
+            yield index, _with_personal_info(result, base_cv)
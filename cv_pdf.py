@@ -0,0 +1,224 @@
+"""
+Server-side PDF export of rendered CVs.
+
+HTML from `cv_renderer` is printed to A4 by headless Chromium (Playwright) running
+in a pool of long-lived worker processes, so the browser start-up cost is paid
+once per worker rather than once per document.
+
+Usage:
+    python cv_pdf.py tailored_cv.json other_cv.json --output-dir pdf/ --workers 2
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from threading import Lock
+from pydantic import BaseModel, Field
+from cv_renderer import render_cv_to_string
+from models import CVSettings, CVWithPersonalInfo
+
+
+# Matches the look of templates/cv_template.html
+DEFAULT_CV_SETTINGS = CVSettings(
+    output_format="pdf",
+    font_size=10,
+    page_margin=0.47,
+    header_font=CVSettings.FontSettings(
+        font_name="Arial", font_size=14, font_weight=700
+    ),
+    sections_title_font=CVSettings.FontSettings(
+        font_name="Arial", font_size=15, font_weight=700
+    ),
+    body_font=CVSettings.FontSettings(
+        font_name="Arial", font_size=10, font_weight=400
+    ),
+)
+
+
+class RenderedPdf(BaseModel):
+    pdf: bytes = Field(..., title="PDF Document")
+    pages: int = Field(..., title="Page Count")
+    seconds: float = Field(..., title="Render Time (seconds)")
+
+    @property
+    def seconds_per_page(self) -> float:
+        return self.seconds / max(self.pages, 1)
+
+
+def _font_css(font: CVSettings.FontSettings) -> str:
+    font_name = json.dumps(font.font_name)
+    return (
+        f"font-family: {font_name}, sans-serif; "
+        f"font-size: {font.font_size}pt; font-weight: {font.font_weight};"
+    )
+
+
+def settings_css(settings: CVSettings) -> str:
+    """CSS applying `CVSettings` on top of the HTML template's own styles."""
+    return (
+        f"@page {{ size: A4; margin: {settings.page_margin}in; }}\n"
+        f"html {{ font-size: {settings.font_size}pt; }}\n"
+        # The page margin replaces the padding the template uses on screen
+        f"body {{ padding: 0; width: auto; min-height: 0; "
+        f"{_font_css(settings.body_font)} }}\n"
+        f".header h1, .header .title {{ {_font_css(settings.header_font)} }}\n"
+        f".section-title {{ {_font_css(settings.sections_title_font)} }}\n"
+    )
+
+
+def render_cv_html_for_pdf(cv: CVWithPersonalInfo, settings: CVSettings) -> str:
+    html = render_cv_to_string(cv)
+    style = f"<style>\n{settings_css(settings)}</style>\n"
+    return html.replace("</head>", style + "</head>", 1)
+
+
+# Per worker process state, created once by `_start_worker`
+_playwright = None
+_browser = None
+
+
+def _start_worker() -> None:
+    global _playwright, _browser
+
+    from playwright.sync_api import sync_playwright
+
+    _playwright = sync_playwright().start()
+    _browser = _playwright.chromium.launch()
+
+
+def _print_pdf(html: str) -> RenderedPdf:
+    from pypdf import PdfReader
+
+    start = time.perf_counter()
+    page = _browser.new_page()
+    try:
+        page.set_content(html, wait_until="load")
+        pdf = page.pdf(prefer_css_page_size=True, print_background=True)
+    finally:
+        page.close()
+    seconds = time.perf_counter() - start
+
+    pages = len(PdfReader(io.BytesIO(pdf)).pages)
+    return RenderedPdf(pdf=pdf, pages=pages, seconds=seconds)
+
+
+def pdf_export_available() -> bool:
+    """Whether playwright is installed, checked without importing it."""
+    return importlib.util.find_spec("playwright") is not None
+
+
+class PdfRenderer:
+    """
+    A pool of worker processes, each keeping a headless browser running.
+
+    If a worker dies, e.g. because Chromium is not installed or crashed, the call
+    fails with BrokenProcessPool and the pool is replaced, so later calls start
+    fresh workers instead of failing for the rest of the process.
+    """
+
+    def __init__(self, workers: int = 2):
+        if not pdf_export_available():
+            raise ImportError(
+                "playwright is not installed. Please install it with "
+                "'uv add playwright && uv run playwright install chromium'"
+            )
+
+        self.workers = workers
+        self._lock = Lock()
+        self._executor = self._start_pool()
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_start_worker)
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            # Another thread may have replaced it already
+            if self._executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._start_pool()
+
+    def render(
+        self, cv: CVWithPersonalInfo, settings: CVSettings = DEFAULT_CV_SETTINGS
+    ) -> RenderedPdf:
+        html = render_cv_html_for_pdf(cv, settings)
+        executor = self._executor
+        try:
+            return executor.submit(_print_pdf, html).result()
+        except BrokenProcessPool:
+            self._replace_pool(executor)
+            raise
+
+    def render_many(
+        self,
+        cvs: Iterable[CVWithPersonalInfo],
+        settings: CVSettings = DEFAULT_CV_SETTINGS,
+    ) -> Iterator[RenderedPdf]:
+        """Render several CVs concurrently across the pool, in input order."""
+        htmls = (render_cv_html_for_pdf(cv, settings) for cv in cvs)
+        executor = self._executor
+        try:
+            yield from executor.map(_print_pdf, htmls)
+        except BrokenProcessPool:
+            self._replace_pool(executor)
+            raise
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self) -> "PdfRenderer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_pdf_renderer: PdfRenderer | None = None
+_pdf_renderer_lock = Lock()
+
+
+def get_pdf_renderer(workers: int = 2) -> PdfRenderer:
+    """Return the process-wide PdfRenderer, starting its workers on first use."""
+    global _pdf_renderer
+
+    with _pdf_renderer_lock:
+        if _pdf_renderer is None:
+            _pdf_renderer = PdfRenderer(workers=workers)
+    return _pdf_renderer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export CV JSON files to PDF.")
+    parser.add_argument(
+        "cv_files", type=Path, nargs="+", help="CVWithPersonalInfo JSON files"
+    )
+    parser.add_argument("--output-dir", type=Path, default=Path("temp"))
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    cvs = [
+        CVWithPersonalInfo.model_validate_json(path.read_bytes())
+        for path in args.cv_files
+    ]
+
+    start = time.perf_counter()
+    with PdfRenderer(workers=args.workers) as renderer:
+        for path, rendered in zip(args.cv_files, renderer.render_many(cvs)):
+            output_path = args.output_dir / f"{path.stem}.pdf"
+            output_path.write_bytes(rendered.pdf)
+            print(
+                f"{output_path}: {rendered.pages} page(s) in "
+                f"{rendered.seconds * 1000:.0f} ms "
+                f"({rendered.seconds_per_page * 1000:.0f} ms/page)"
+            )
+    print(f"Exported {len(cvs)} PDF(s) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
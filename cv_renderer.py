@@ -1,28 +1,56 @@
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+import asyncio
+import os
+from functools import cache
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from cache import CACHE_ROOT
+from instrumentation import stage
 from models import CVWithPersonalInfo
 
+if TYPE_CHECKING:
+    from jinja2 import Environment, Template
 
-def render_cv_template(cv: CVWithPersonalInfo, output_path: str | Path) -> None:
-    """
-    Render a CV using the Jinja template and save it to the specified path.
-    
-    Args:
-        cv: CVWithPersonalInfo model containing the CV data
-        output_path: Path where the rendered HTML file should be saved
-    """
-    # Set up Jinja2 environment
-    template_dir = Path(__file__).parent / "templates"
-    env = Environment(
-        loader=FileSystemLoader(template_dir),
-        autoescape=select_autoescape(['html', 'xml'])
+
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+TEMPLATE_NAME = "cv_template.html"
+BYTECODE_CACHE_DIR = CACHE_ROOT / "jinja"
+
+# Set CV_RENDERER_DEV=1 to pick up template edits without restarting the process
+DEV_MODE = os.environ.get("CV_RENDERER_DEV") == "1"
+
+
+@cache
+def _environment() -> "Environment":
+    # Imported here so that importing this module does not load Jinja
+    from jinja2 import (
+        Environment,
+        FileSystemBytecodeCache,
+        FileSystemLoader,
+        select_autoescape,
+    )
+
+    BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=select_autoescape(['html', 'xml']),
+        # Compiled templates survive restarts through the bytecode cache, and are
+        # only re-checked against the template file in dev mode
+        bytecode_cache=FileSystemBytecodeCache(BYTECODE_CACHE_DIR),
+        auto_reload=DEV_MODE,
     )
-    
-    # Load the template
-    template = env.get_template("cv_template.html")
-    
-    # Render the template with CV data
-    rendered_html = template.render(
+
+
+def _load_template() -> "Template":
+    return _environment().get_template(TEMPLATE_NAME)
+
+
+def warm_up() -> None:
+    """Compile the template ahead of the first render."""
+    _load_template()
+
+
+def _cv_context(cv: CVWithPersonalInfo) -> dict[str, Any]:
+    return dict(
         full_name=cv.full_name,
         email=cv.email,
         phone=cv.phone,
@@ -36,11 +64,60 @@ def render_cv_template(cv: CVWithPersonalInfo, output_path: str | Path) -> None:
         volunteer_work=cv.volunteer_work,
         skills=cv.skills,
     )
-    
+
+
+def render_cv_sections(sections: dict[str, Any]) -> str:
+    """
+    Render whichever CV fields are available to an HTML string.
+
+    Used for progressive previews while a CV is still being generated: missing
+    sections are simply left out of the output.
+
+    Args:
+        sections: Mapping of template fields (e.g. `title`, `experiences`) to values
+    """
+    return _load_template().render(**sections)
+
+
+def render_cv_to_string(cv: CVWithPersonalInfo) -> str:
+    """
+    Render a CV using the Jinja template, without touching the disk.
+
+    Args:
+        cv: CVWithPersonalInfo model containing the CV data
+    """
+    with stage("render"):
+        return _load_template().render(**_cv_context(cv))
+
+
+def _write_html(rendered_html: str, output_path: str | Path) -> None:
     # Ensure output directory exists
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    
+
     # Save the rendered HTML
     with open(output_path, "w", encoding="utf-8") as f:
         f.write(rendered_html)
+
+
+def render_cv_template(cv: CVWithPersonalInfo, output_path: str | Path) -> str:
+    """
+    Render a CV using the Jinja template and save it to the specified path.
+
+    Args:
+        cv: CVWithPersonalInfo model containing the CV data
+        output_path: Path where the rendered HTML file should be saved
+
+    Returns:
+        The rendered HTML, so callers do not need to read the file back
+    """
+    rendered_html = render_cv_to_string(cv)
+    _write_html(rendered_html, output_path)
+    return rendered_html
+
+
+async def arender_cv_template(cv: CVWithPersonalInfo, output_path: str | Path) -> str:
+    """Like `render_cv_template`, but writes the file in a worker thread."""
+    rendered_html = render_cv_to_string(cv)
+    await asyncio.to_thread(_write_html, rendered_html, output_path)
+    return rendered_html
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from threading import Lock
+from pydantic import BaseModel, Field
+from models import CVWithPersonalInfo
+
+
+HISTORY_DB_PATH = Path("history.sqlite3")
+
+DEFAULT_MAX_AGE_SECONDS = 90 * 24 * 60 * 60
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Older base CV and user story revisions beyond this many per session are dropped
+DEFAULT_REVISIONS_PER_SESSION = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS base_cvs (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    cv_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS base_cvs_session ON base_cvs (session_id, created_at);
+CREATE INDEX IF NOT EXISTS base_cvs_created ON base_cvs (created_at);
+
+CREATE TABLE IF NOT EXISTS user_stories (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    story TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS user_stories_session ON user_stories (session_id, created_at);
+CREATE INDEX IF NOT EXISTS user_stories_created ON user_stories (created_at);
+
+CREATE TABLE IF NOT EXISTS generations (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    job_description_hash TEXT NOT NULL,
+    job_description TEXT NOT NULL,
+    model TEXT NOT NULL,
+    timings_json TEXT NOT NULL,
+    cv_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS generations_session ON generations (session_id, created_at);
+CREATE INDEX IF NOT EXISTS generations_created ON generations (created_at);
+CREATE INDEX IF NOT EXISTS generations_job_description ON generations (job_description_hash);
+"""
+
+
+class Generation(BaseModel):
+    id: int = Field(..., title="Generation ID")
+    session_id: str = Field(..., title="Session ID")
+    created_at: float = Field(..., title="Created At (unix time)")
+    job_description_hash: str = Field(..., title="Job Description SHA-256")
+    job_description: str = Field(..., title="Job Description")
+    model: str = Field(..., title="Model")
+    timings: dict[str, float] = Field(default_factory=dict, title="Timings (seconds)")
+
+
+def hash_job_description(job_description: str) -> str:
+    return hashlib.sha256(job_description.strip().encode("utf-8")).hexdigest()
+
+
+class HistoryStore:
+    """
+    SQLite-backed history of base CVs, user stories and generated CVs per session.
+
+    Every lookup goes through a (session_id, created_at) index, and
+    `apply_retention` bounds both the age of rows and the size of the database.
+    Connections are per thread, so the store can be shared with job workers.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = HISTORY_DB_PATH,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        revisions_per_session: int = DEFAULT_REVISIONS_PER_SESSION,
+    ):
+        self.path = Path(path)
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self.revisions_per_session = revisions_per_session
+        self._local = threading.local()
+
+        connection = self._connection()
+        connection.executescript(_SCHEMA)
+        if connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 0:
+            # Stores created before auto_vacuum was enabled only pick it up on a
+            # full VACUUM, which is needed just once
+            connection.execute("VACUUM")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            # Only takes effect on a new database if it precedes the switch to WAL,
+            # which writes the database header
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def save_base_cv(self, session_id: str, cv_json: str) -> None:
+        self._connection().execute(
+            "INSERT INTO base_cvs (session_id, created_at, cv_json) VALUES (?, ?, ?)",
+            (session_id, time.time(), cv_json),
+        )
+        self._trim_revisions("base_cvs", session_id)
+
+    def latest_base_cv(self, session_id: str) -> str | None:
+        row = self._connection().execute(
+            "SELECT cv_json FROM base_cvs WHERE session_id = ? "
+            "ORDER BY created_at DESC LIMIT 1",
+            (session_id,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def save_user_story(self, session_id: str, story: str) -> None:
+        self._connection().execute(
+            "INSERT INTO user_stories (session_id, created_at, story) VALUES (?, ?, ?)",
+            (session_id, time.time(), story),
+        )
+        self._trim_revisions("user_stories", session_id)
+
+    def latest_user_story(self, session_id: str) -> str | None:
+        row = self._connection().execute(
+            "SELECT story FROM user_stories WHERE session_id = ? "
+            "ORDER BY created_at DESC LIMIT 1",
+            (session_id,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def add_generation(
+        self,
+        session_id: str,
+        job_description: str,
+        model: str,
+        cv: CVWithPersonalInfo,
+        timings: dict[str, float],
+    ) -> int:
+        cursor = self._connection().execute(
+            "INSERT INTO generations (session_id, created_at, job_description_hash, "
+            "job_description, model, timings_json, cv_json) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                session_id,
+                time.time(),
+                hash_job_description(job_description),
+                job_description,
+                model,
+                json.dumps(timings),
+                cv.model_dump_json(),
+            ),
+        )
+        self.apply_retention()
+        return cursor.lastrowid
+
+    def list_generations(self, session_id: str, limit: int = 20) -> list[Generation]:
+        """Most recent generations of a session, newest first, without their CVs."""
+        rows = self._connection().execute(
+            "SELECT id, session_id, created_at, job_description_hash, job_description, "
+            "model, timings_json FROM generations WHERE session_id = ? "
+            "ORDER BY created_at DESC LIMIT ?",
+            (session_id, limit),
+        ).fetchall()
+        return [
+            Generation(
+                id=row[0],
+                session_id=row[1],
+                created_at=row[2],
+                job_description_hash=row[3],
+                job_description=row[4],
+                model=row[5],
+                timings=json.loads(row[6]),
+            )
+            for row in rows
+        ]
+
+    def get_generated_cv(
+        self, generation_id: int, session_id: str
+    ) -> CVWithPersonalInfo | None:
+        row = self._connection().execute(
+            "SELECT cv_json FROM generations WHERE id = ? AND session_id = ?",
+            (generation_id, session_id),
+        ).fetchone()
+        return CVWithPersonalInfo.model_validate_json(row[0]) if row else None
+
+    def _trim_revisions(self, table: str, session_id: str) -> None:
+        self._connection().execute(
+            f"DELETE FROM {table} WHERE id IN ("
+            f"SELECT id FROM {table} WHERE session_id = ? "
+            "ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (session_id, self.revisions_per_session),
+        )
+
+    def size_bytes(self) -> int:
+        connection = self._connection()
+        page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = connection.execute("PRAGMA freelist_count").fetchone()[0]
+        page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+        return (page_count - freelist_count) * page_size
+
+    def apply_retention(self) -> None:
+        """Delete rows older than `max_age_seconds`, then the oldest generations
+        until the database fits in `max_bytes`."""
+        connection = self._connection()
+        cutoff = time.time() - self.max_age_seconds
+        for table in ("base_cvs", "user_stories", "generations"):
+            connection.execute(f"DELETE FROM {table} WHERE created_at < ?", (cutoff,))
+
+        while self.size_bytes() > self.max_bytes:
+            deleted = connection.execute(
+                "DELETE FROM generations WHERE id IN ("
+                "SELECT id FROM generations ORDER BY created_at LIMIT 100)"
+            ).rowcount
+            if not deleted:
+                break
+
+        # Each row of the result frees one page, so it must be read to the end
+        connection.execute("PRAGMA incremental_vacuum").fetchall()
+
+
+_history_store: HistoryStore | None = None
+_history_store_lock = Lock()
+
+
+def get_history_store() -> HistoryStore:
+    """Return the process-wide history store."""
+    global _history_store
+
+    with _history_store_lock:
+        if _history_store is None:
+            _history_store = HistoryStore()
+    return _history_store
@@ -0,0 +1,281 @@
+"""
+Per-stage latency and LLM token metrics for the CV pipeline.
+
+Wrap work in `stage("name")` to record its wall time. LLM calls report Ollama's
+token counts and durations through `ollama_metrics_callback()`, attributed to the
+enclosing stage. Every finished stage is logged as one JSON object on the
+`cv_metrics` logger, and the aggregates can be exported in the Prometheus text
+format to a file or a small HTTP endpoint.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from persistence import atomic_write_text
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+
+logger = logging.getLogger("cv_metrics")
+
+_current_stage: ContextVar[str | None] = ContextVar("cv_current_stage", default=None)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stage_count: dict[str, int] = defaultdict(int)
+        self.stage_errors: dict[str, int] = defaultdict(int)
+        self.stage_seconds: dict[str, float] = defaultdict(float)
+        self.prompt_tokens: dict[str, int] = defaultdict(int)
+        self.completion_tokens: dict[str, int] = defaultdict(int)
+        self.prompt_eval_seconds: dict[str, float] = defaultdict(float)
+        self.eval_seconds: dict[str, float] = defaultdict(float)
+        self.load_seconds: dict[str, float] = defaultdict(float)
+
+    def reset(self) -> None:
+        with self._lock:
+            for values in (
+                self.stage_count,
+                self.stage_errors,
+                self.stage_seconds,
+                self.prompt_tokens,
+                self.completion_tokens,
+                self.prompt_eval_seconds,
+                self.eval_seconds,
+                self.load_seconds,
+            ):
+                values.clear()
+
+    def record_stage(self, name: str, seconds: float, failed: bool) -> None:
+        with self._lock:
+            self.stage_count[name] += 1
+            self.stage_seconds[name] += seconds
+            if failed:
+                self.stage_errors[name] += 1
+
+    def record_llm(
+        self,
+        name: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        prompt_eval_seconds: float,
+        eval_seconds: float,
+        load_seconds: float,
+    ) -> None:
+        with self._lock:
+            self.prompt_tokens[name] += prompt_tokens
+            self.completion_tokens[name] += completion_tokens
+            self.prompt_eval_seconds[name] += prompt_eval_seconds
+            self.eval_seconds[name] += eval_seconds
+            self.load_seconds[name] += load_seconds
+
+    def prometheus_text(self) -> str:
+        series = [
+            ("cv_stage_runs_total", "Completed runs per stage", self.stage_count),
+            ("cv_stage_errors_total", "Failed runs per stage", self.stage_errors),
+            ("cv_stage_seconds_total", "Wall time per stage", self.stage_seconds),
+            (
+                "cv_llm_prompt_tokens_total",
+                "Prompt tokens evaluated by Ollama",
+                self.prompt_tokens,
+            ),
+            (
+                "cv_llm_completion_tokens_total",
+                "Tokens generated by Ollama",
+                self.completion_tokens,
+            ),
+            (
+                "cv_llm_prompt_eval_seconds_total",
+                "Ollama prompt evaluation time",
+                self.prompt_eval_seconds,
+            ),
+            (
+                "cv_llm_eval_seconds_total",
+                "Ollama generation time",
+                self.eval_seconds,
+            ),
+            (
+                "cv_llm_load_seconds_total",
+                "Ollama model load time",
+                self.load_seconds,
+            ),
+        ]
+
+        lines = []
+        with self._lock:
+            for name, help_text, values in series:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for stage_name, value in sorted(values.items()):
+                    lines.append(f'{name}{{stage="{stage_name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def _log(event: dict[str, Any]) -> None:
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps(event))
+
+
+@contextmanager
+def stage(name: str, **fields: Any) -> Iterator[None]:
+    """Record the wall time of a pipeline stage. Extra `fields` go into its log line."""
+    token = _current_stage.set(name)
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        try:
+            _current_stage.reset(token)
+        except ValueError:
+            # A generator closed from another context, e.g. during garbage collection
+            pass
+        metrics.record_stage(name, seconds, failed)
+        _log(
+            {
+                "event": "stage",
+                "stage": name,
+                "seconds": round(seconds, 6),
+                "failed": failed,
+                **fields,
+            }
+        )
+
+
+def record_ollama_usage(response_metadata: dict[str, Any]) -> None:
+    """Attribute the token counts and durations Ollama reports to the current stage."""
+    name = _current_stage.get() or "llm"
+    prompt_tokens = response_metadata.get("prompt_eval_count") or 0
+    completion_tokens = response_metadata.get("eval_count") or 0
+    # Ollama reports durations in nanoseconds
+    prompt_eval_seconds = (response_metadata.get("prompt_eval_duration") or 0) / 1e9
+    eval_seconds = (response_metadata.get("eval_duration") or 0) / 1e9
+    load_seconds = (response_metadata.get("load_duration") or 0) / 1e9
+
+    metrics.record_llm(
+        name,
+        prompt_tokens,
+        completion_tokens,
+        prompt_eval_seconds,
+        eval_seconds,
+        load_seconds,
+    )
+    _log(
+        {
+            "event": "llm",
+            "stage": name,
+            "model": response_metadata.get("model"),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "prompt_eval_seconds": round(prompt_eval_seconds, 6),
+            "eval_seconds": round(eval_seconds, 6),
+            "load_seconds": round(load_seconds, 6),
+            "prompt_tokens_per_second": (
+                round(prompt_tokens / prompt_eval_seconds, 2)
+                if prompt_eval_seconds
+                else None
+            ),
+            "tokens_per_second": (
+                round(completion_tokens / eval_seconds, 2) if eval_seconds else None
+            ),
+        }
+    )
+
+
+def ollama_metrics_callback():
+    """A LangChain callback handler that records Ollama usage for every LLM call."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class OllamaMetricsCallback(BaseCallbackHandler):
+        def on_llm_end(self, response, **kwargs) -> None:
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    if message is not None:
+                        record_ollama_usage(message.response_metadata)
+
+    return OllamaMetricsCallback()
+
+
+def write_prometheus(path: str | Path) -> None:
+    """Write the metrics in the Prometheus text format, e.g. for a textfile collector."""
+    atomic_write_text(path, metrics.prometheus_text())
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+    """Serve the metrics at `http://host:port/metrics` from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def configure_from_env() -> None:
+    """
+    Enable exporters from environment variables.
+
+    CV_METRICS_LOG: append the JSON log lines to this file
+    CV_METRICS_PORT: serve Prometheus metrics on this local port
+    """
+    log_path = os.environ.get("CV_METRICS_LOG")
+    if log_path:
+        handler = logging.FileHandler(log_path, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+    port = os.environ.get("CV_METRICS_PORT")
+    if port:
+        start_metrics_server(int(port))
+
+
+@contextmanager
+def profiled(output_path: str | Path | None) -> Iterator[None]:
+    """Run the block under cProfile and dump the stats to `output_path` (no-op if None)."""
+    if output_path is None:
+        yield
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(output_path)
@@ -0,0 +1,160 @@
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Literal
+
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+DEFAULT_MAX_WORKERS = 4
+# Ollama serves one model from one GPU, so by default jobs for a model run one at a time
+DEFAULT_PER_MODEL_CONCURRENCY = 1
+# Finished jobs are kept this long so their session can still pick up the result
+FINISHED_JOB_RETENTION_SECONDS = 60 * 60
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """A unit of background work, owned by one session."""
+
+    def __init__(self, session_id: str, model_key: str):
+        self.id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.model_key = model_key
+        self.status: JobStatus = "queued"
+        self.progress = 0.0
+        self.partial: Any = None
+        self.result: Any = None
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.finished_at: float | None = None
+        self._cancel_event = threading.Event()
+        self._future: Future | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def report(self, progress: float, partial: Any = None) -> None:
+        """Called by the job function to publish progress and an intermediate result."""
+        self.progress = min(max(progress, 0.0), 1.0)
+        if partial is not None:
+            self.partial = partial
+
+    def check_cancelled(self) -> None:
+        """Called by the job function at safe points; raises once cancellation was requested."""
+        if self.cancel_requested:
+            raise JobCancelled()
+
+
+class JobScheduler:
+    """
+    Runs jobs on a bounded thread pool, limiting how many run against each model at once.
+
+    Jobs are submitted with the id of the session that owns them and can only be
+    looked up or cancelled from that session.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        per_model_concurrency: int = DEFAULT_PER_MODEL_CONCURRENCY,
+    ):
+        self.per_model_concurrency = per_model_concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="job"
+        )
+        self._jobs: dict[str, Job] = {}
+        self._model_slots: dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        session_id: str,
+        fn: Callable[[Job], Any],
+        model_key: str = "default",
+    ) -> str:
+        """Queue `fn(job)` and return the job id. Its return value becomes `job.result`."""
+        self._prune()
+
+        job = Job(session_id, model_key)
+        with self._lock:
+            self._jobs[job.id] = job
+            slots = self._model_slots.setdefault(
+                model_key, threading.Semaphore(self.per_model_concurrency)
+            )
+        job._future = self._executor.submit(self._run, job, fn, slots)
+        return job.id
+
+    def _run(self, job: Job, fn: Callable[[Job], Any], slots: threading.Semaphore):
+        try:
+            # Wait for a model slot, but give up as soon as the job is cancelled
+            while not slots.acquire(timeout=0.5):
+                job.check_cancelled()
+            try:
+                job.check_cancelled()
+                job.status = "running"
+                job.result = fn(job)
+                job.progress = 1.0
+                job.status = "succeeded"
+            finally:
+                slots.release()
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id: str, session_id: str) -> Job | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.session_id != session_id:
+            return None
+        return job
+
+    def cancel(self, job_id: str, session_id: str) -> bool:
+        job = self.get(job_id, session_id)
+        if job is None or job.done:
+            return False
+
+        job._cancel_event.set()
+        if job._future is not None and job._future.cancel():
+            # Never started, so _run will not mark it
+            job.status = "cancelled"
+            job.finished_at = time.time()
+        return True
+
+    def _prune(self) -> None:
+        now = time.time()
+        with self._lock:
+            for job_id, job in list(self._jobs.items()):
+                if (
+                    job.finished_at is not None
+                    and now - job.finished_at > FINISHED_JOB_RETENTION_SECONDS
+                ):
+                    del self._jobs[job_id]
+
+
+_scheduler: JobScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> JobScheduler:
+    """Return the process-wide scheduler shared by all sessions."""
+    global _scheduler
+
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = JobScheduler()
+    return _scheduler
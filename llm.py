@@ -1,21 +1,129 @@
-from typing import Literal
-from models import CV, CVWithPersonalInfo
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain_core.prompts import PromptTemplate
+import json
+import logging
+from collections.abc import AsyncIterator, Iterator, Sequence
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Literal
+from cache import CACHE_ROOT, DiskCache
+from instrumentation import ollama_metrics_callback, stage
+from pathlib import Path
+from models import (
+    CV,
+    CVHeader,
+    CVSkills,
+    CVWithPersonalInfo,
+    ModelProfile,
+    OllamaEndpoint,
+    RawCV,
+)
+from pdf_ingest import extract_pdf
+from prompt_encoding import compact_json, format_instructions, prompt_token_report
+from pydantic import BaseModel, create_model
+
+# LangChain takes most of a second to import, so it is only loaded once an LLM is
+# built; importing this module stays cheap for callers that never prompt
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.output_parsers import PydanticOutputParser
+    from langchain_core.prompts import PromptTemplate
+    from output_parsing import SectionsInvalid
+
+
+logger = logging.getLogger(__name__)
+
+GENERATED_CV_CACHE_DIR = CACHE_ROOT / "generated_cv"
+
+DEFAULT_MODEL_NAME = "deepseek-r1:14b"
+DEFAULT_TEMPERATURE = 0.1
+# How long Ollama keeps the model in memory after the last request
+DEFAULT_KEEP_ALIVE = "30m"
+# Known-good decoding settings per model. Reasoning is turned off where the model
+# allows it: with the output constrained to the schema, free-form reasoning before
+# the JSON mostly spends the token budget without improving the CV.
+MODEL_PROFILES = {
+    "deepseek-r1:14b": ModelProfile(reasoning="off"),
+    "deepseek-r1:8b": ModelProfile(reasoning="off"),
+    "qwen3:8b": ModelProfile(reasoning="off"),
+    "qwen3:14b": ModelProfile(reasoning="off"),
+    "gpt-oss:20b": ModelProfile(reasoning="low"),
+}
+DEFAULT_MODEL_PROFILE = ModelProfile()
+
+# Invalid sections re-requested one by one before giving up on a generated CV. A
+# reply cut off at num_predict typically loses the last few sections.
+MAX_REPAIRED_SECTIONS = 3
+# Sections the generator has nothing to tailor in; when invalid or cut off, the
+# base CV's version is used instead of re-requesting them
+COPIED_SECTIONS = ("certificates", "languages", "education")
+
+CV_PARSER_TEMPLATE = (
+    "You are an expert CV parser."
+    "Extract all information from the following CV text into the requested JSON format.\n"
+    "{format_instructions}"
+    "CV Text:\n"
+    "{raw_cv_text}\n"
+    "Link URLs found in the CV (use them for the matching links):\n"
+    "{link_urls}"
+)
 
 
 class LLM:
-    def __init__(self, provider: Literal["ollama"] = "ollama"):
-        if provider == "ollama":
+    def __init__(
+        self,
+        provider: Literal["ollama"] = "ollama",
+        model_name: str = DEFAULT_MODEL_NAME,
+        temperature: float = DEFAULT_TEMPERATURE,
+        keep_alive: str = DEFAULT_KEEP_ALIVE,
+        cv_cache: DiskCache | None = None,
+        chat_model: "BaseChatModel | None" = None,
+        profile: ModelProfile | None = None,
+        endpoints: Sequence[OllamaEndpoint] | None = None,
+    ):
+        """
+        `profile` defaults to the one registered for `model_name` in MODEL_PROFILES.
+        `chat_model` replaces the model that would be created for `provider`, e.g.
+        with a local stand-in so the pipeline can be benchmarked without Ollama.
+        `endpoints` default to those in CV_OLLAMA_ENDPOINTS; with more than one,
+        requests are load balanced over them with failover (see llm_router).
+        """
+        self.provider = provider
+        self.model_name = model_name
+        self.temperature = temperature
+        self.keep_alive = keep_alive
+        self.profile = profile or get_model_profile(model_name)
+        self._structured_models: dict[type[BaseModel], Any] = {}
+        self.cv_cache = cv_cache or DiskCache(GENERATED_CV_CACHE_DIR)
+        self._custom_model = chat_model is not None
+
+        if chat_model is not None:
+            self.model = chat_model
+        elif provider == "ollama":
             from langchain_ollama import ChatOllama
+            from llm_router import OllamaRouter, endpoints_from_env
 
-            self.model = ChatOllama(
-                model="deepseek-r1:14b",
-                temperature=0.1,
-                validate_model_on_init=True,
-                num_predict=4096,
+            if endpoints is None:
+                endpoints = endpoints_from_env()
+            options = dict(
+                temperature=self.temperature,
+                num_predict=self.profile.num_predict,
+                num_ctx=self.profile.num_ctx,
+                reasoning=self.profile.ollama_reasoning,
+                keep_alive=self.keep_alive,
             )
+            if len(endpoints) > 1:
+                self.model = OllamaRouter(
+                    model=self.model_name,
+                    endpoints=list(endpoints),
+                    chat_options=options,
+                    callbacks=[ollama_metrics_callback()],
+                )
+            else:
+                self.model = ChatOllama(
+                    model=self.model_name,
+                    base_url=endpoints[0].url if endpoints else None,
+                    validate_model_on_init=True,
+                    callbacks=[ollama_metrics_callback()],
+                    **options,
+                )
         # elif provider == "openai":
         #     try:
         #         from langchain_openai import ChatOpenAI
@@ -32,26 +140,44 @@ class LLM:
 
         self.__init_cv_parser()
         self.__init_cv_generator()
+        self.__init_section_tailoring()
+
+    def _structured(self, schema_model: type[BaseModel]):
+        """The chat model, constrained to emit JSON matching `schema_model` if the
+        profile asks for structured output."""
+        if not self.profile.structured_output:
+            return self.model
+        # Building the JSON schema takes milliseconds, so bind once per model
+        bound = self._structured_models.get(schema_model)
+        if bound is None:
+            bound = self.model.bind(format=schema_model.model_json_schema())
+            self._structured_models[schema_model] = bound
+        return bound
 
     def __init_cv_parser(self):
-        self.cv_parser = PydanticOutputParser(pydantic_object=CVWithPersonalInfo)
+        from langchain_core.prompts import PromptTemplate
+        from output_parsing import TolerantOutputParser
+
+        self.cv_parser = TolerantOutputParser(pydantic_object=CVWithPersonalInfo)
         self.cv_parser_prompt = PromptTemplate(
-            template=(
-                "You are an expert CV parser."
-                "Extract all information from the following CV text into the requested JSON format.\n"
-                "{format_instructions}"
-                "CV Text:\n"
-                "{raw_cv_text}"
-            ),
-            input_variables=["raw_cv_text"],
+            template=CV_PARSER_TEMPLATE,
+            input_variables=["raw_cv_text", "link_urls"],
             partial_variables={
-                "format_instructions": self.cv_parser.get_format_instructions()
+                "format_instructions": format_instructions(CVWithPersonalInfo)
             },
         )
-        self.cv_parser_chain = self.cv_parser_prompt | self.model | self.cv_parser
+        self.cv_parser_chain = (
+            self.cv_parser_prompt
+            | self._structured(CVWithPersonalInfo)
+            | self.cv_parser
+        )
+        self.cv_parser_version = cv_parser_version(self.model_name, self.profile)
 
     def __init_cv_generator(self):
-        self.cv_generator_parser = PydanticOutputParser(pydantic_object=CV)
+        from langchain_core.prompts import PromptTemplate
+        from output_parsing import TolerantOutputParser
+
+        self.cv_generator_parser = TolerantOutputParser(pydantic_object=CV)
         self.cv_generator_prompt = PromptTemplate(
             template=(
                 "You are an expert CV writer and career advisor. "
@@ -75,47 +201,654 @@ class LLM:
             ),
             input_variables=["user_story", "job_description", "base_cv"],
             partial_variables={
-                "format_instructions": self.cv_generator_parser.get_format_instructions()
+                "format_instructions": format_instructions(CV)
             },
         )
         self.cv_generator_chain = (
-            self.cv_generator_prompt | self.model | self.cv_generator_parser
+            self.cv_generator_prompt
+            | self._structured(CV)
+            | self.cv_generator_parser
+        )
+
+    def __init_section_tailoring(self):
+        from langchain_core.prompts import PromptTemplate
+        from output_parsing import TolerantOutputParser
+
+        section_prompt = PromptTemplate(
+            template=(
+                "You are an expert CV writer and career advisor. "
+                "Your task is to tailor one section of a CV ({section_name}) to match the given job description."
+                "{format_instructions}\n"
+                "Use only the information from the section and the user story—do not fabricate or add information not present in the provided materials."
+                "Instructions:\n"
+                "1. Emphasize the parts of the section that are relevant to the job requirements\n"
+                "2. Use keywords from the job description naturally\n"
+                "3. Maintain professionalism and truthfulness - do not add fake information\n"
+                "4. Keep the same writing style but optimize the content for this specific role\n"
+                "Here is the job description:\n"
+                "{job_description}\n"
+                "Here is the section in JSON format:\n"
+                "{section}\n"
+                "Here is the user story to consider:\n"
+                "{user_story}\n"
+            ),
+            input_variables=["section_name", "user_story", "job_description", "section"],
+        )
+        self.section_prompt = section_prompt
+        self.section_prompt_template = section_prompt.template
+        self._section_repair_chains = {}
+        self.section_format_instructions = {
+            model: format_instructions(model)
+            for model in (CVHeader, CVSkills, CV.Experience)
+        }
+
+        self.cv_header_parser = TolerantOutputParser(pydantic_object=CVHeader)
+        self.cv_header_chain = (
+            section_prompt.partial(
+                section_name="title and summary",
+                format_instructions=self.section_format_instructions[CVHeader],
+            )
+            | self._structured(CVHeader)
+            | self.cv_header_parser
+        )
+
+        self.cv_experience_parser = TolerantOutputParser(pydantic_object=CV.Experience)
+        self.cv_experience_chain = (
+            section_prompt.partial(
+                section_name="a single experience entry",
+                format_instructions=self.section_format_instructions[CV.Experience],
+            )
+            | self._structured(CV.Experience)
+            | self.cv_experience_parser
+        )
+
+        self.cv_skills_parser = TolerantOutputParser(pydantic_object=CVSkills)
+        self.cv_skills_chain = (
+            section_prompt.partial(
+                section_name="skills grouped by category",
+                format_instructions=self.section_format_instructions[CVSkills],
+            )
+            | self._structured(CVSkills)
+            | self.cv_skills_parser
+        )
+
+    def warm_up(self) -> None:
+        """Load the model into Ollama memory so the first request does not pay for it."""
+        if self.provider == "ollama" and not self._custom_model:
+            from llm_router import OllamaRouter
+            from ollama import Client
+
+            if isinstance(self.model, OllamaRouter):
+                hosts = [endpoint.url for endpoint in self.model.endpoints]
+            else:
+                hosts = [self.model.base_url]
+            # A generate request without a prompt only loads the model
+            for host in hosts:
+                try:
+                    Client(host=host).generate(
+                        model=self.model_name, keep_alive=self.keep_alive
+                    )
+                except Exception as e:
+                    # The router keeps down endpoints out of rotation
+                    if len(hosts) == 1:
+                        raise
+                    logger.warning("Could not warm up %s: %r", host, e)
+
+    def _generate_cv_cache_key(
+        self, user_story: str, job_description: str, base_cv_json: str
+    ) -> str:
+        return DiskCache.make_key(
+            self.model_name,
+            repr(self.temperature),
+            self.profile.model_dump_json(),
+            self.cv_generator_prompt.template,
+            self.cv_generator_prompt.partial_variables["format_instructions"],
+            base_cv_json,
+            job_description,
+            user_story,
         )
 
-    def generate_cv(self, user_story: str, job_description: str, base_cv: CV) -> CV:
-        response = self.cv_generator_chain.invoke(
-            {
-                "user_story": user_story,
-                "job_description": job_description,
-                "base_cv": base_cv.model_dump_json(),
-            }
+    def _invoke(
+        self,
+        prompt_template: "PromptTemplate",
+        parser: "PydanticOutputParser",
+        inputs: dict[str, str],
+        stage_name: str,
+    ):
+        """Run prompt, model and parser as separately timed stages."""
+        with stage("prompt_build"):
+            prompt = prompt_template.invoke(inputs)
+        with stage(stage_name, model=self.model_name):
+            message = self._structured(parser.pydantic_object).invoke(prompt)
+        with stage("output_parse"):
+            return parser.invoke(message)
+
+    async def _ainvoke(
+        self,
+        prompt_template: "PromptTemplate",
+        parser: "PydanticOutputParser",
+        inputs: dict[str, str],
+        stage_name: str,
+    ):
+        with stage("prompt_build"):
+            prompt = prompt_template.invoke(inputs)
+        with stage(stage_name, model=self.model_name):
+            message = await self._structured(parser.pydantic_object).ainvoke(prompt)
+        with stage("output_parse"):
+            return parser.invoke(message)
+
+    def _generator_inputs(
+        self, user_story: str, job_description: str, base_cv: CV
+    ) -> tuple[str, dict[str, str]]:
+        with stage("prompt_build"):
+            base_cv_json = compact_json(base_cv)
+            cache_key = self._generate_cv_cache_key(
+                user_story, job_description, base_cv_json
+            )
+        inputs = {
+            "user_story": user_story,
+            "job_description": job_description,
+            "base_cv": base_cv_json,
+        }
+        logger.info(
+            "CV generator prompt tokens (estimated): %s",
+            prompt_token_report(
+                self.cv_generator_prompt.template,
+                format_instructions=self.cv_generator_prompt.partial_variables[
+                    "format_instructions"
+                ],
+                **inputs,
+            ),
         )
+        return cache_key, inputs
+
+    def _section_repair_chain(self, field: str):
+        """Chain that tailors a single top-level CV field on its own."""
+        chain = self._section_repair_chains.get(field)
+        if chain is None:
+            from output_parsing import TolerantOutputParser
+
+            info = CV.model_fields[field]
+            section_model = create_model(
+                f"CV_{field}", **{field: (info.annotation, info)}
+            )
+            chain = (
+                self.section_prompt.partial(
+                    section_name=f"the {info.title or field} section",
+                    format_instructions=format_instructions(section_model),
+                )
+                | self._structured(section_model)
+                | TolerantOutputParser(pydantic_object=section_model)
+            )
+            self._section_repair_chains[field] = chain
+        return chain
+
+    def _section_repairs(
+        self, error: "SectionsInvalid", inputs: dict[str, str], base_cv: CV
+    ) -> tuple[dict[str, Any], list[tuple[str, dict[str, str]]]]:
+        """
+        The valid part of a generated CV, completed with the base CV's version
+        of invalid sections that are not tailored, and the inputs re-requesting
+        the other invalid sections.
+        """
+        if not all(field in CV.model_fields for field in error.fields):
+            raise error
+
+        data = dict(error.data)
+        fields = []
+        for field in error.fields:
+            value = getattr(base_cv, field)
+            if field in COPIED_SECTIONS or not value:
+                data[field] = value
+            else:
+                fields.append(field)
+        if len(fields) > MAX_REPAIRED_SECTIONS:
+            raise error
+
+        logger.warning(
+            "Invalid CV sections %s: re-requesting %s", error.fields, fields
+        )
+        return data, [
+            (
+                field,
+                {
+                    "user_story": inputs["user_story"],
+                    "job_description": inputs["job_description"],
+                    "section": base_cv.model_dump_json(
+                        include={field}, exclude_none=True
+                    ),
+                },
+            )
+            for field in fields
+        ]
+
+    def _parse_generated_cv(
+        self, text: str, inputs: dict[str, str], base_cv: CV
+    ) -> CV:
+        """
+        Parse a generated CV, re-requesting only the sections that fail validation
+        instead of the whole CV.
+        """
+        from output_parsing import SectionsInvalid
+
+        try:
+            with stage("output_parse"):
+                return self.cv_generator_parser.parse(text)
+        except SectionsInvalid as e:
+            error = e
+
+        data, repairs = self._section_repairs(error, inputs, base_cv)
+        with stage("section_repair", sections=error.fields):
+            for field, section_inputs in repairs:
+                section = self._section_repair_chain(field).invoke(section_inputs)
+                data[field] = getattr(section, field)
+        with stage("output_parse"):
+            return self.cv_generator_parser.validate_data(data)
+
+    async def _aparse_generated_cv(
+        self, text: str, inputs: dict[str, str], base_cv: CV
+    ) -> CV:
+        import asyncio
+        from output_parsing import SectionsInvalid
+
+        try:
+            with stage("output_parse"):
+                return self.cv_generator_parser.parse(text)
+        except SectionsInvalid as e:
+            error = e
+
+        data, repairs = self._section_repairs(error, inputs, base_cv)
+        with stage("section_repair", sections=error.fields):
+            sections = await asyncio.gather(
+                *(
+                    self._section_repair_chain(field).ainvoke(section_inputs)
+                    for field, section_inputs in repairs
+                )
+            )
+            for (field, _), section in zip(repairs, sections):
+                data[field] = getattr(section, field)
+        with stage("output_parse"):
+            return self.cv_generator_parser.validate_data(data)
+
+    def generate_cv(
+        self,
+        user_story: str,
+        job_description: str,
+        base_cv: CV,
+        use_cache: bool = True,
+    ) -> CV:
+        cache_key, inputs = self._generator_inputs(
+            user_story, job_description, base_cv
+        )
+
+        # Identical inputs produce an identical prompt, so skip the model entirely
+        if use_cache:
+            cached = self.cv_cache.get(cache_key)
+            if cached is not None:
+                return CV.model_validate(cached)
+
+        with stage("prompt_build"):
+            prompt = self.cv_generator_prompt.invoke(inputs)
+        with stage("llm_generate", model=self.model_name):
+            message = self._structured(CV).invoke(prompt)
+        response = self._parse_generated_cv(message.text, inputs, base_cv)
+
+        if use_cache:
+            self.cv_cache.set(cache_key, response.model_dump(mode="json"))
 
         return response
 
-    def parse_cv_with_personal_info(self, raw_cv_path) -> CVWithPersonalInfo:
+    def stream_cv(
+        self,
+        user_story: str,
+        job_description: str,
+        base_cv: CV,
+        use_cache: bool = True,
+    ) -> Iterator[dict[str, Any] | CV]:
+        """
+        Stream a tailored CV section by section.
+
+        Yields a dict of the top-level CV sections that are complete so far each
+        time a new one finishes (a section is complete once the model has moved
+        on to the next key), and finally the validated `CV` itself.
+        """
+        cache_key, inputs = self._generator_inputs(
+            user_story, job_description, base_cv
+        )
+
+        if use_cache:
+            cached = self.cv_cache.get(cache_key)
+            if cached is not None:
+                yield CV.model_validate(cached)
+                return
+
+        from output_parsing import SectionStream
+
+        prompt = self.cv_generator_prompt.invoke(inputs)
+
+        sections = SectionStream()
+        with stage("llm_stream", model=self.model_name):
+            for chunk in self._structured(CV).stream(prompt):
+                completed = sections.feed(chunk.text)
+                if completed:
+                    yield completed
 
-        loader = PyPDFLoader(raw_cv_path)
+        response = self._parse_generated_cv(sections.text, inputs, base_cv)
 
-        docs = loader.load_and_split()
-        # load hypertext links if any
+        if use_cache:
+            self.cv_cache.set(cache_key, response.model_dump(mode="json"))
+
+        yield response
+
+    async def agenerate_cv(
+        self,
+        user_story: str,
+        job_description: str,
+        base_cv: CV,
+        use_cache: bool = True,
+    ) -> CV:
+        cache_key, inputs = self._generator_inputs(
+            user_story, job_description, base_cv
+        )
+
+        if use_cache:
+            cached = self.cv_cache.get(cache_key)
+            if cached is not None:
+                return CV.model_validate(cached)
+
+        with stage("prompt_build"):
+            prompt = self.cv_generator_prompt.invoke(inputs)
+        with stage("llm_generate", model=self.model_name):
+            message = await self._structured(CV).ainvoke(prompt)
+        response = await self._aparse_generated_cv(message.text, inputs, base_cv)
+
+        if use_cache:
+            self.cv_cache.set(cache_key, response.model_dump(mode="json"))
+
+        return response
 
-        raw_cv_text = "\n".join([doc.page_content for doc in docs])
+    async def generate_cv_batch(
+        self,
+        base_cv: CV,
+        job_descriptions: Sequence[str],
+        user_story: str,
+        max_concurrency: int = 4,
+        timeout: float | None = None,
+        use_cache: bool = True,
+    ) -> AsyncIterator[tuple[int, CV | Exception]]:
+        """
+        Tailor one CV to many job descriptions concurrently.
 
-        parsed_cv = self.cv_parser_chain.invoke({"raw_cv_text": raw_cv_text})
-        # TODO do fuzzy matching to link url_annotations to parsed_cv.links
-        # get url by reading all annotations from pdf
+        Yields `(index, result)` pairs in completion order, where `index` points
+        into `job_descriptions` and `result` is either the tailored CV or the
+        exception raised for that item (including `TimeoutError` when an item
+        runs longer than `timeout` seconds). At most `max_concurrency` requests
+        run at once. Closing the iterator early cancels all pending items.
+        """
+        import asyncio
 
-        return parsed_cv
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(index: int, job_description: str):
+            async with semaphore:
+                try:
+                    cv = await asyncio.wait_for(
+                        self.agenerate_cv(
+                            user_story, job_description, base_cv, use_cache
+                        ),
+                        timeout,
+                    )
+                except Exception as e:
+                    return index, e
+                return index, cv
+
+        tasks = [
+            asyncio.create_task(run(index, job_description))
+            for index, job_description in enumerate(job_descriptions)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def agenerate_cv_by_sections(
+        self,
+        user_story: str,
+        job_description: str,
+        base_cv: CV,
+        max_concurrency: int = 4,
+        use_cache: bool = True,
+    ) -> CV:
+        """
+        Tailor a CV with one small prompt per section instead of one large completion.
+
+        The title/summary, every experience and volunteer entry, and the skills are
+        tailored concurrently (at most `max_concurrency` at once; Ollama only runs
+        them in parallel when OLLAMA_NUM_PARALLEL allows it). Languages,
+        certificates and education are passed through without an LLM call.
+        """
+        import asyncio
+
+        base_cv_json = compact_json(base_cv)
+        cache_key = DiskCache.make_key(
+            "sections",
+            self.model_name,
+            repr(self.temperature),
+            self.profile.model_dump_json(),
+            self.section_prompt_template,
+            *self.section_format_instructions.values(),
+            base_cv_json,
+            job_description,
+            user_story,
+        )
+        if use_cache:
+            cached = self.cv_cache.get(cache_key)
+            if cached is not None:
+                return CV.model_validate(cached)
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def tailor(chain, section: str):
+            async with semaphore:
+                return await chain.ainvoke(
+                    {
+                        "user_story": user_story,
+                        "job_description": job_description,
+                        "section": section,
+                    }
+                )
+
+        header_context = {
+            "title": base_cv.title,
+            "self_summary": base_cv.self_summary,
+            "experiences": [
+                f"{experience.position} at {experience.company}"
+                for experience in base_cv.experiences
+            ],
+        }
+
+        skills = base_cv.skills
+        if not skills:
+            # Nothing to tailor yet, so let the model group the skills listed per experience
+            experience_skills = [
+                skill
+                for experience in base_cv.experiences + base_cv.volunteer_work
+                for skill in experience.skills or []
+            ]
+            skills = [
+                CV.Skill(
+                    category="Skills", skills=list(dict.fromkeys(experience_skills))
+                )
+            ]
+
+        with stage("llm_generate_sections", model=self.model_name):
+            header, skills_section, *entries = await asyncio.gather(
+                tailor(
+                    self.cv_header_chain,
+                    json.dumps(header_context, separators=(",", ":")),
+                ),
+                tailor(
+                    self.cv_skills_chain,
+                    compact_json(CVSkills.model_construct(skills=skills)),
+                ),
+                *(
+                    tailor(self.cv_experience_chain, compact_json(experience))
+                    for experience in base_cv.experiences + base_cv.volunteer_work
+                ),
+            )
+
+        experience_count = len(base_cv.experiences)
+        response = CV(
+            title=header.title,
+            self_summary=header.self_summary,
+            experiences=entries[:experience_count],
+            certificates=base_cv.certificates,
+            languages=base_cv.languages,
+            education=base_cv.education,
+            volunteer_work=entries[experience_count:],
+            skills=skills_section.skills,
+        )
+
+        if use_cache:
+            self.cv_cache.set(cache_key, response.model_dump(mode="json"))
+
+        return response
+
+    def generate_cv_by_sections(
+        self,
+        user_story: str,
+        job_description: str,
+        base_cv: CV,
+        max_concurrency: int = 4,
+        use_cache: bool = True,
+    ) -> CV:
+        import asyncio
+
+        return asyncio.run(
+            self.agenerate_cv_by_sections(
+                user_story, job_description, base_cv, max_concurrency, use_cache
+            )
+        )
+
+    def _parser_inputs(self, raw_cv: RawCV | str | Path) -> dict[str, str]:
+        if not isinstance(raw_cv, RawCV):
+            raw_cv = extract_pdf(raw_cv)
+
+        inputs = {
+            "raw_cv_text": raw_cv.text,
+            "link_urls": "\n".join(raw_cv.links) or "None",
+        }
+        logger.info(
+            "CV parser prompt tokens (estimated): %s",
+            prompt_token_report(
+                self.cv_parser_prompt.template,
+                format_instructions=self.cv_parser_prompt.partial_variables[
+                    "format_instructions"
+                ],
+                **inputs,
+            ),
+        )
+        return inputs
+
+    def parse_cv_with_personal_info(
+        self, raw_cv: RawCV | str | Path
+    ) -> CVWithPersonalInfo:
+        """Parse a CV into structured data. Accepts already extracted content or a PDF path."""
+        return self._invoke(
+            self.cv_parser_prompt,
+            self.cv_parser,
+            self._parser_inputs(raw_cv),
+            "llm_parse",
+        )
+
+    async def aparse_cv_with_personal_info(
+        self, raw_cv: RawCV | str | Path
+    ) -> CVWithPersonalInfo:
+        import asyncio
+
+        inputs = await asyncio.to_thread(self._parser_inputs, raw_cv)
+
+        return await self._ainvoke(
+            self.cv_parser_prompt, self.cv_parser, inputs, "llm_parse"
+        )
+
+
+def get_model_profile(model_name: str) -> ModelProfile:
+    return MODEL_PROFILES.get(model_name, DEFAULT_MODEL_PROFILE)
+
+
+def cv_parser_version(
+    model_name: str = DEFAULT_MODEL_NAME, profile: ModelProfile | None = None
+) -> str:
+    """
+    Changes whenever the parser prompt, the model or the CV schema changes.
+
+    Derived from the configuration alone, so parsed CVs can be looked up without
+    building the chat model or reaching Ollama.
+    """
+    profile = profile or get_model_profile(model_name)
+    return DiskCache.make_key(
+        model_name,
+        profile.model_dump_json(),
+        CV_PARSER_TEMPLATE,
+        format_instructions(CVWithPersonalInfo),
+        json.dumps(CVWithPersonalInfo.model_json_schema(), sort_keys=True),
+    )
+
+
+_llm_registry: dict[tuple[str, str, float, str, ModelProfile | None], LLM] = {}
+_llm_registry_lock = Lock()
+
+
+def get_llm(
+    provider: Literal["ollama"] = "ollama",
+    model_name: str = DEFAULT_MODEL_NAME,
+    temperature: float = DEFAULT_TEMPERATURE,
+    keep_alive: str = DEFAULT_KEEP_ALIVE,
+    profile: ModelProfile | None = None,
+) -> LLM:
+    """
+    Return the process-wide LLM for the given configuration, creating it on first use.
+
+    Constructing an LLM validates the model against the Ollama server and builds
+    the parsers and prompts, so instances are shared across requests and threads.
+    """
+    key = (provider, model_name, temperature, keep_alive, profile)
+    with _llm_registry_lock:
+        llm = _llm_registry.get(key)
+        if llm is None:
+            llm = LLM(
+                provider=provider,
+                model_name=model_name,
+                temperature=temperature,
+                keep_alive=keep_alive,
+                profile=profile,
+            )
+            _llm_registry[key] = llm
+    return llm
+
+
+def warm_up_llm(
+    provider: Literal["ollama"] = "ollama",
+    model_name: str = DEFAULT_MODEL_NAME,
+    temperature: float = DEFAULT_TEMPERATURE,
+    keep_alive: str = DEFAULT_KEEP_ALIVE,
+    profile: ModelProfile | None = None,
+) -> LLM:
+    """Create the shared LLM for the given configuration and preload its model."""
+    llm = get_llm(provider, model_name, temperature, keep_alive, profile)
+    llm.warm_up()
+    return llm
 
 
 if __name__ == "__main__":
-    llm = LLM(provider="ollama")
+    llm = warm_up_llm(provider="ollama")
     print("LLM initialized successfully.")
 
     parsed_cv = llm.parse_cv_with_personal_info("temp/cv.pdf")
     # save the parsed cv as json
-    import json
-
     with open("temp/parsed_cv.json", "w", encoding="utf-8") as f:
         json.dump(parsed_cv.model_dump(), f, ensure_ascii=False, indent=4)
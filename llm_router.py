@@ -0,0 +1,397 @@
+"""
+Routing of chat requests over a pool of Ollama servers.
+
+Each request goes to the healthy endpoint with the fewest requests in flight
+relative to its concurrency limit. An endpoint that cannot be reached, or that
+answers with a server error, is taken out of rotation and the request is
+retried on another one. A background health check polls every endpoint and
+puts it back once it is up and serves the model again, so a restarted server
+rejoins the pool on its own. Streams are only retried before their first chunk,
+since what was already yielded cannot be taken back.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+import httpx
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_ollama import ChatOllama
+from ollama import Client, ResponseError
+from pydantic import Field, PrivateAttr, model_validator
+from models import OllamaEndpoint
+
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS_ENV = "CV_OLLAMA_ENDPOINTS"
+
+DEFAULT_HEALTH_CHECK_INTERVAL = 10.0
+DEFAULT_HEALTH_CHECK_TIMEOUT = 2.0
+# How long a request waits for a free, healthy endpoint before failing
+DEFAULT_ACQUIRE_TIMEOUT = 60.0
+
+_ASYNC_POLL_SECONDS = 0.02
+
+
+def endpoints_from_env() -> list[OllamaEndpoint]:
+    """
+    Endpoints listed in CV_OLLAMA_ENDPOINTS, comma-separated, each optionally
+    followed by `=<max concurrency>`: "http://gpu1:11434=4,http://gpu2:11434".
+    """
+    endpoints = []
+    for item in os.environ.get(ENDPOINTS_ENV, "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        url, _, limit = item.rpartition("=")
+        if url and limit.isdigit():
+            endpoints.append(OllamaEndpoint(url=url, max_concurrency=int(limit)))
+        else:
+            endpoints.append(OllamaEndpoint(url=item))
+    return endpoints
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether another endpoint may succeed where this one failed with `error`."""
+    if isinstance(error, ResponseError):
+        # 404: this server does not have the model; 429: its queue is full
+        return error.status_code >= 500 or error.status_code in (404, 429)
+    # The Ollama client turns connection failures into the builtin ConnectionError
+    return isinstance(error, (ConnectionError, httpx.TransportError))
+
+
+class _EndpointState:
+    def __init__(self, endpoint: OllamaEndpoint, chat_model: ChatOllama):
+        self.endpoint = endpoint
+        self.chat_model = chat_model
+        self.in_flight = 0
+        self.healthy = True
+        self.served = 0
+        self.failures = 0
+
+    @property
+    def load(self) -> float:
+        return self.in_flight / self.endpoint.max_concurrency
+
+    @property
+    def has_capacity(self) -> bool:
+        return self.healthy and self.in_flight < self.endpoint.max_concurrency
+
+
+class OllamaRouter(BaseChatModel):
+    """
+    A chat model that spreads requests over several Ollama servers.
+
+    `chat_options` are passed to the ChatOllama of every endpoint, e.g.
+    temperature, num_predict or keep_alive. With `health_check_interval=0` there
+    is no background check, and a failed endpoint only returns after an explicit
+    `check_health()`. While every endpoint is down, requests fail at once rather
+    than wait for one to come back. Call `close()` to stop the health check
+    thread.
+    """
+
+    endpoints: list[OllamaEndpoint] = Field(..., min_length=1)
+    model: str
+    chat_options: dict[str, Any] = Field(default_factory=dict)
+    health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL
+    health_check_timeout: float = DEFAULT_HEALTH_CHECK_TIMEOUT
+    acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT
+
+    _states: list[_EndpointState] = PrivateAttr(default_factory=list)
+    _condition: threading.Condition = PrivateAttr(default_factory=threading.Condition)
+    _stopped: threading.Event = PrivateAttr(default_factory=threading.Event)
+
+    @model_validator(mode="after")
+    def _start_endpoints(self) -> "OllamaRouter":
+        self._states = [
+            _EndpointState(
+                endpoint,
+                ChatOllama(
+                    model=self.model, base_url=endpoint.url, **self.chat_options
+                ),
+            )
+            for endpoint in self.endpoints
+        ]
+        self.check_health()
+        if not any(state.healthy for state in self._states):
+            raise ValueError(
+                f"None of the Ollama endpoints serve `{self.model}`: "
+                + ", ".join(endpoint.url for endpoint in self.endpoints)
+            )
+        if self.health_check_interval > 0:
+            threading.Thread(
+                target=self._health_check_loop, name="ollama-health", daemon=True
+            ).start()
+        return self
+
+    @property
+    def _llm_type(self) -> str:
+        return "ollama-router"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {
+            "model": self.model,
+            "endpoints": [endpoint.url for endpoint in self.endpoints],
+            **self.chat_options,
+        }
+
+    def _is_healthy(self, state: _EndpointState) -> bool:
+        client = Client(host=state.endpoint.url, timeout=self.health_check_timeout)
+        try:
+            models = [model.model for model in client.list().models]
+        except Exception:
+            return False
+        return any(
+            self.model == name or name.startswith(f"{self.model}:")
+            for name in models
+            if name
+        )
+
+    def check_health(self) -> None:
+        """Check every endpoint now, updating which ones receive requests."""
+        results = {}
+
+        def check(state: _EndpointState) -> None:
+            results[state] = self._is_healthy(state)
+
+        threads = [
+            threading.Thread(target=check, args=(state,)) for state in self._states
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with self._condition:
+            for state, healthy in results.items():
+                if healthy != state.healthy:
+                    logger.warning(
+                        "Ollama endpoint %s is %s",
+                        state.endpoint.url,
+                        "back up" if healthy else "down",
+                    )
+                state.healthy = healthy
+            self._condition.notify_all()
+
+    def _health_check_loop(self) -> None:
+        while not self._stopped.wait(self.health_check_interval):
+            self.check_health()
+
+    def close(self) -> None:
+        self._stopped.set()
+
+    def stats(self) -> list[dict[str, Any]]:
+        with self._condition:
+            return [
+                {
+                    "url": state.endpoint.url,
+                    "healthy": state.healthy,
+                    "in_flight": state.in_flight,
+                    "served": state.served,
+                    "failures": state.failures,
+                }
+                for state in self._states
+            ]
+
+    def _try_acquire(self, tried: set[_EndpointState]) -> _EndpointState | None:
+        """Reserve the least loaded endpoint with capacity; call with the lock held."""
+        candidates = [
+            state
+            for state in self._states
+            if state not in tried and state.has_capacity
+        ]
+        if not candidates:
+            return None
+        state = min(candidates, key=lambda state: (state.load, state.served))
+        state.in_flight += 1
+        return state
+
+    def _raise_if_exhausted(
+        self, tried: set[_EndpointState], last_error: BaseException | None
+    ) -> None:
+        # Every endpoint failed this request once already or is known to be down;
+        # fail now rather than wait for the health check to bring one back
+        if all(state in tried or not state.healthy for state in self._states):
+            raise last_error or ConnectionError(
+                "None of the Ollama endpoints are up: "
+                + ", ".join(endpoint.url for endpoint in self.endpoints)
+            )
+
+    def _timed_out(self, last_error: BaseException | None) -> BaseException:
+        return last_error or TimeoutError(
+            f"No Ollama endpoint available within {self.acquire_timeout:.0f}s"
+        )
+
+    def _acquire(
+        self, tried: set[_EndpointState], last_error: BaseException | None
+    ) -> _EndpointState:
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._condition:
+            while True:
+                self._raise_if_exhausted(tried, last_error)
+                state = self._try_acquire(tried)
+                if state is not None:
+                    return state
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise self._timed_out(last_error)
+                # Woken by a finished request or a health check
+                self._condition.wait(remaining)
+
+    async def _aacquire(
+        self, tried: set[_EndpointState], last_error: BaseException | None
+    ) -> _EndpointState:
+        # Waiting on the condition would block the event loop, so poll instead
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            with self._condition:
+                self._raise_if_exhausted(tried, last_error)
+                state = self._try_acquire(tried)
+            if state is not None:
+                return state
+            if time.monotonic() >= deadline:
+                raise self._timed_out(last_error)
+            await asyncio.sleep(_ASYNC_POLL_SECONDS)
+
+    def _release(self, state: _EndpointState, error: BaseException | None) -> None:
+        with self._condition:
+            state.in_flight -= 1
+            if error is None:
+                state.served += 1
+            else:
+                state.failures += 1
+                if state.healthy:
+                    logger.warning(
+                        "Ollama endpoint %s failed, retrying elsewhere: %r",
+                        state.endpoint.url,
+                        error,
+                    )
+                # Out of rotation until the health check sees it serving again
+                state.healthy = False
+            self._condition.notify_all()
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tried: set[_EndpointState] = set()
+        last_error = None
+        while True:
+            state = self._acquire(tried, last_error)
+            try:
+                result = state.chat_model._generate(
+                    messages, stop=stop, run_manager=run_manager, **kwargs
+                )
+            except Exception as e:
+                if not is_retryable(e):
+                    self._release(state, None)
+                    raise
+                self._release(state, e)
+                tried.add(state)
+                last_error = e
+                continue
+            self._release(state, None)
+            return result
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tried: set[_EndpointState] = set()
+        last_error = None
+        while True:
+            state = await self._aacquire(tried, last_error)
+            try:
+                result = await state.chat_model._agenerate(
+                    messages, stop=stop, run_manager=run_manager, **kwargs
+                )
+            except asyncio.CancelledError:
+                self._release(state, None)
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    self._release(state, None)
+                    raise
+                self._release(state, e)
+                tried.add(state)
+                last_error = e
+                continue
+            self._release(state, None)
+            return result
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        # The caller reports each chunk to the callbacks, so run_manager is not
+        # passed on, or every token would be reported twice
+        tried: set[_EndpointState] = set()
+        last_error = None
+        while True:
+            state = self._acquire(tried, last_error)
+            started = False
+            error = None
+            try:
+                for chunk in state.chat_model._stream(messages, stop=stop, **kwargs):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                error = last_error = e
+                if started:
+                    raise
+                tried.add(state)
+            finally:
+                self._release(state, error)
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        tried: set[_EndpointState] = set()
+        last_error = None
+        while True:
+            state = await self._aacquire(tried, last_error)
+            started = False
+            error = None
+            try:
+                async for chunk in state.chat_model._astream(
+                    messages, stop=stop, **kwargs
+                ):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                error = last_error = e
+                if started:
+                    raise
+                tried.add(state)
+            finally:
+                self._release(state, error)
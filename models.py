@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Literal
 
 
@@ -17,6 +17,39 @@ class CVSettings(BaseModel):
     body_font: FontSettings = Field(..., title="Body Font Settings")
 
 
+class ModelProfile(BaseModel):
+    """Decoding settings for one model served by Ollama."""
+
+    model_config = ConfigDict(frozen=True)
+
+    num_predict: int = Field(4096, title="Maximum Generated Tokens")
+    num_ctx: Optional[int] = Field(None, title="Context Window (tokens)")
+    # "on" returns the reasoning separately from the answer; "low", "medium" and
+    # "high" limit it on models that support reasoning effort levels
+    reasoning: Literal["default", "on", "off", "low", "medium", "high"] = Field(
+        "default", title="Reasoning"
+    )
+    structured_output: bool = Field(True, title="Constrain Output to the JSON Schema")
+
+    @property
+    def ollama_reasoning(self) -> bool | str | None:
+        """The value of ChatOllama's `reasoning` option for this profile."""
+        return {"default": None, "on": True, "off": False}.get(
+            self.reasoning, self.reasoning
+        )
+
+
+class OllamaEndpoint(BaseModel):
+    """One Ollama server in the pool requests are routed over."""
+
+    model_config = ConfigDict(frozen=True)
+
+    url: str = Field(..., title="Base URL")
+    # Requests beyond Ollama's own parallelism only queue on the server, where
+    # they can no longer be sent to an idle endpoint instead
+    max_concurrency: int = Field(2, ge=1, title="Concurrent Requests")
+
+
 class CV(BaseModel):
     class Link(BaseModel):
         label: str = Field(..., title="Link Label")
@@ -67,6 +100,19 @@ class CV(BaseModel):
     skills: list[Skill] = Field(default_factory=list, title="Skills", min_length=1)
 
 
+class CVHeader(BaseModel):
+    """The title and summary of a CV, tailored on their own in section mode."""
+
+    title: str = Field(..., title="Professional Title")
+    self_summary: str = Field(..., title="Description")
+
+
+class CVSkills(BaseModel):
+    """The skills section of a CV, tailored on its own in section mode."""
+
+    skills: list[CV.Skill] = Field(..., title="Skills", min_length=1)
+
+
 class CVWithPersonalInfo(CV):
 
     full_name: str = Field(..., title="Full Name")
@@ -76,16 +122,10 @@ class CVWithPersonalInfo(CV):
         default_factory=list, title="Links (e.g., LinkedIn, GitHub)"
     )
 
+    # Pydantic does not validate model instances again, so these conversions only
+    # check that each nested entry has the right type
     def into_cv(self) -> CV:
-        return CV(
-            title=self.title,
-            self_summary=self.self_summary,
-            experiences=self.experiences,
-            certificates=self.certificates,
-            languages=self.languages,
-            education=self.education,
-            volunteer_work=self.volunteer_work,
-        )
+        return CV(**{name: getattr(self, name) for name in CV.model_fields})
 
     @staticmethod
     def from_cv(
@@ -96,13 +136,41 @@ class CVWithPersonalInfo(CV):
             email=email,
             phone=phone,
             links=links,
-            title=cv.title,
-            self_summary=cv.self_summary,
-            experiences=cv.experiences,
-            certificates=cv.certificates,
-            languages=cv.languages,
-            education=cv.education,
-            volunteer_work=cv.volunteer_work,
-            skills=cv.skills,
+            **{name: getattr(cv, name) for name in CV.model_fields},
         )
 
+
+class CVRelevance(BaseModel):
+    """Relevance of CV items to a job description, from 0 (unrelated) to 1 (best)."""
+
+    experiences: list[list[float]] = Field(
+        default_factory=list, title="Bullet Scores per Experience"
+    )
+    volunteer_work: list[list[float]] = Field(
+        default_factory=list, title="Bullet Scores per Volunteer Work Entry"
+    )
+    skills: list[list[float]] = Field(
+        default_factory=list, title="Skill Scores per Category"
+    )
+    matched_terms: list[str] = Field(
+        default_factory=list, title="Job Description Terms Found in the CV"
+    )
+
+
+class RelevanceFilter(BaseModel):
+    """How to prune and order CV content by relevance before prompting."""
+
+    min_score: float = Field(0.0, ge=0, le=1, title="Minimum Relevance")
+    max_bullets: Optional[int] = Field(None, ge=1, title="Bullets Kept per Experience")
+    reorder: bool = Field(False, title="Most Relevant Bullets First")
+
+
+class RawCV(BaseModel):
+    """Text and link targets extracted from a CV document before LLM parsing."""
+
+    pages: list[str] = Field(default_factory=list, title="Page Texts")
+    links: list[str] = Field(default_factory=list, title="Link URLs")
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.pages)
@@ -0,0 +1,251 @@
+"""
+Tolerant parsing of LLM output into pydantic models.
+
+Reasoning models such as deepseek-r1 put a <think> block before the answer, and
+long answers come back with small JSON defects: markdown fences, trailing
+commas, text after the object, or an object cut off at the token limit. These
+are repaired locally. What still fails validation is reported per top-level
+field, so the caller can re-request only that section. A cut-off object is
+never accepted as is: the field it was cut off in and every field it did not
+reach are reported invalid, rather than left to truncated text and defaults.
+"""
+
+import json
+import re
+from typing import Any
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.outputs import Generation
+from langchain_core.utils.json import parse_partial_json
+from pydantic import BaseModel, ValidationError
+
+
+# An unterminated block means the model ran out of tokens while still reasoning
+_THINK_RE = re.compile(r"<think>.*?(?:</think>|$)", re.DOTALL)
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL)
+
+
+def strip_reasoning(text: str) -> str:
+    """Remove <think> blocks and markdown code fences around the answer."""
+    text = _THINK_RE.sub("", text)
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    return text.strip()
+
+
+def _remove_trailing_commas(text: str) -> str:
+    chars = []
+    in_string = False
+    escaped = False
+    pending_comma = False
+
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            chars.append(char)
+            continue
+
+        if pending_comma and not char.isspace():
+            if char not in "}]":
+                chars.append(",")
+            pending_comma = False
+
+        if char == ",":
+            pending_comma = True
+            continue
+        if char == '"':
+            in_string = True
+        chars.append(char)
+
+    return "".join(chars)
+
+
+def repair_json(text: str) -> tuple[Any, bool]:
+    """
+    Parse the JSON answer in an LLM reply, repairing common defects.
+
+    Returns the value and whether the reply was truncated, i.e. it had to be
+    completed by closing the strings, arrays and objects left open. Raises
+    OutputParserException if no JSON value can be recovered.
+    """
+    answer = strip_reasoning(text)
+    starts = [i for i in (answer.find("{"), answer.find("[")) if i != -1]
+    if not starts:
+        raise OutputParserException("No JSON found in the output", llm_output=text)
+    answer = answer[min(starts) :]
+
+    decoder = json.JSONDecoder(strict=False)
+    try:
+        # raw_decode ignores anything after the JSON value
+        return decoder.raw_decode(answer)[0], False
+    except json.JSONDecodeError:
+        pass
+
+    answer = _remove_trailing_commas(answer)
+    try:
+        return decoder.raw_decode(answer)[0], False
+    except json.JSONDecodeError:
+        pass
+
+    try:
+        # Closes strings, arrays and objects left open by a truncated reply
+        parsed = parse_partial_json(answer)
+    except json.JSONDecodeError:
+        parsed = None
+    if parsed is None:
+        raise OutputParserException("Invalid JSON in the output", llm_output=text)
+    return parsed, True
+
+
+def invalid_fields(error: ValidationError) -> list[str]:
+    """Top-level fields that failed validation, in order of appearance."""
+    fields = []
+    for detail in error.errors():
+        if not detail["loc"]:
+            return []
+        field = str(detail["loc"][0])
+        if field not in fields:
+            fields.append(field)
+    return fields
+
+
+class SectionsInvalid(OutputParserException):
+    """
+    The output is valid JSON, but some top-level fields failed validation or
+    were cut off. `data` holds the parsed fields without the invalid ones.
+    """
+
+    def __init__(self, data: dict[str, Any], fields: list[str], message: str):
+        super().__init__(message, llm_output=json.dumps(data))
+        self.data = data
+        self.fields = fields
+
+
+class TolerantOutputParser(PydanticOutputParser):
+    """
+    A PydanticOutputParser that strips reasoning and repairs the JSON first.
+
+    Validation errors confined to top-level fields, and truncated replies, raise
+    `SectionsInvalid`, which carries the parsed data so the fields can be fixed
+    individually.
+    """
+
+    def parse_result(
+        self, result: list[Generation], *, partial: bool = False
+    ) -> BaseModel | None:
+        text = result[0].text
+        try:
+            data, truncated = repair_json(text)
+        except OutputParserException:
+            if partial:
+                return None
+            raise
+        if truncated and not partial:
+            self._reject_truncated(data)
+        return self.validate_data(data)
+
+    def _reject_truncated(self, data: Any) -> None:
+        if not isinstance(data, dict) or not data:
+            raise OutputParserException(
+                "The output was cut off", llm_output=json.dumps(data)
+            )
+        # The last field is the one the reply was cut off in, and the fields
+        # after it were never written
+        cut_off = list(data)[-1]
+        fields = [cut_off] + [
+            field for field in self.pydantic_object.model_fields if field not in data
+        ]
+        complete = {key: value for key, value in data.items() if key != cut_off}
+        raise SectionsInvalid(
+            complete,
+            fields,
+            f"The output was cut off in `{cut_off}`, leaving these fields "
+            f"incomplete: {', '.join(fields)}",
+        )
+
+    def validate_data(self, data: Any) -> BaseModel:
+        try:
+            return self.pydantic_object.model_validate(data)
+        except ValidationError as e:
+            fields = invalid_fields(e)
+            if isinstance(data, dict) and fields:
+                raise SectionsInvalid(
+                    {key: value for key, value in data.items() if key not in fields},
+                    fields,
+                    str(e),
+                ) from e
+            raise OutputParserException(str(e), llm_output=json.dumps(data)) from e
+
+
+class SectionStream:
+    """
+    Finds the completed top-level values of a JSON object as it is streamed.
+
+    Each chunk is scanned once. A value is complete when a comma follows it at
+    the top level of the object, so the object is only decoded when a new
+    section finishes, rather than re-parsing the whole reply on every chunk.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._position = 0
+        self._start: int | None = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def _find_start(self) -> bool:
+        search_from = 0
+        if "<think>" in self.text:
+            end = self.text.find("</think>")
+            if end == -1:
+                return False
+            search_from = end + len("</think>")
+
+        start = self.text.find("{", search_from)
+        if start == -1:
+            return False
+        self._start = start
+        self._position = start
+        return True
+
+    def feed(self, chunk: str) -> dict[str, Any] | None:
+        """Add a chunk; returns all completed sections when a new one finished."""
+        self.text += chunk
+        if self._start is None and not self._find_start():
+            return None
+
+        boundary = None
+        text = self.text
+        for index in range(self._position, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+            elif char == "," and self._depth == 1:
+                boundary = index
+        self._position = len(text)
+
+        if boundary is None:
+            return None
+        try:
+            return json.loads(text[self._start : boundary] + "}", strict=False)
+        except json.JSONDecodeError:
+            return None
+
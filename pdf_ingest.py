@@ -0,0 +1,56 @@
+import io
+import mmap
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+from instrumentation import stage
+from models import RawCV
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
+
+def _read_pdf(pdf_reader: "PdfReader") -> RawCV:
+    pages = []
+    links = []
+
+    for page in pdf_reader.pages:
+        pages.append(page.extract_text())
+
+        if "/Annots" not in page:
+            continue
+
+        for annot_ref in page["/Annots"]:  # type: ignore
+            # Resolve each annotation once; nested lookups go through the resolved dict
+            annot = annot_ref.get_object()
+            if annot.get("/Subtype") != "/Link" or "/A" not in annot:
+                continue
+
+            uri = annot["/A"].get("/URI")
+            if uri and uri not in links:
+                links.append(str(uri))
+
+    return RawCV(pages=pages, links=links)
+
+
+def extract_pdf(source: str | Path | bytes | BinaryIO) -> RawCV:
+    """
+    Read a PDF once, returning the text of every page and the URIs of its link annotations.
+
+    Args:
+        source: Path to the PDF, its raw bytes, or a binary file object such as an
+            uploaded file buffer. Paths are memory-mapped rather than copied.
+    """
+    # pypdf is only needed once a PDF is actually uploaded
+    from pypdf import PdfReader
+
+    with stage("pdf_extract"):
+        if isinstance(source, bytes):
+            return _read_pdf(PdfReader(io.BytesIO(source)))
+
+        if isinstance(source, (str, Path)):
+            with open(source, "rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapped:
+                return _read_pdf(PdfReader(mapped))
+
+        return _read_pdf(PdfReader(source))
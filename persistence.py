@@ -0,0 +1,117 @@
+import atexit
+import os
+import tempfile
+import threading
+from collections.abc import Callable, Hashable
+from pathlib import Path
+from typing import Any, TypeVar
+
+
+T = TypeVar("T")
+
+# Seconds of quiet before a debounced write hits the disk
+DEFAULT_DEBOUNCE_SECONDS = 1.0
+
+
+def atomic_write_text(path: str | Path, text: str) -> None:
+    """
+    Write a text file so that readers only ever see the old or the new content.
+
+    The content goes to a temp file in the same directory, which then replaces
+    the target in a single rename.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+_read_cache: dict[tuple[Path, Callable], tuple[int, int, Any]] = {}
+_read_cache_lock = threading.Lock()
+
+
+def read_cached(path: str | Path, loader: Callable[[str], T]) -> T | None:
+    """
+    Return `loader(file text)`, re-reading the file only when its mtime or size changed.
+
+    Returns None if the file does not exist.
+    """
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+
+    key = (path.resolve(), loader)
+    with _read_cache_lock:
+        cached = _read_cache.get(key)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    with open(path, "r", encoding="utf-8") as f:
+        value = loader(f.read())
+
+    with _read_cache_lock:
+        _read_cache[key] = (stat.st_mtime_ns, stat.st_size, value)
+    return value
+
+
+class DebouncedWriter:
+    """
+    Collapses bursts of writes to the same key into one write.
+
+    Each `write` restarts the key's timer; the latest content is passed to
+    `write_fn(key, text)` once no new write arrived for `delay` seconds. By default
+    keys are file paths written atomically. `pending` lets readers see content that
+    is not written yet, and everything still pending is flushed at exit.
+    """
+
+    def __init__(
+        self,
+        delay: float = DEFAULT_DEBOUNCE_SECONDS,
+        write_fn: Callable[[Any, str], None] = atomic_write_text,
+    ):
+        self.delay = delay
+        self.write_fn = write_fn
+        self._pending: dict[Hashable, str] = {}
+        self._timers: dict[Hashable, threading.Timer] = {}
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def write(self, key: Hashable, text: str) -> None:
+        with self._lock:
+            self._pending[key] = text
+            timer = self._timers.pop(key, None)
+            if timer is not None:
+                timer.cancel()
+            timer = threading.Timer(self.delay, self.flush, args=(key,))
+            timer.daemon = True
+            self._timers[key] = timer
+            timer.start()
+
+    def pending(self, key: Hashable) -> str | None:
+        with self._lock:
+            return self._pending.get(key)
+
+    def flush(self, key: Hashable | None = None) -> None:
+        """Write pending content now, for one key or all of them."""
+        with self._lock:
+            keys = [key] if key is not None else list(self._pending)
+            for k in keys:
+                timer = self._timers.pop(k, None)
+                if timer is not None:
+                    timer.cancel()
+                text = self._pending.pop(k, None)
+                if text is not None:
+                    self.write_fn(k, text)
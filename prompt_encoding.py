@@ -0,0 +1,92 @@
+import json
+from typing import Any
+from pydantic import BaseModel
+
+
+# Rough characters-per-token ratio for English/JSON text with Llama-style tokenizers
+CHARS_PER_TOKEN = 4
+
+_JSON_TYPES = {
+    "string": "str",
+    "integer": "int",
+    "number": "float",
+    "boolean": "bool",
+    "null": "null",
+}
+
+
+def _describe(schema: dict[str, Any], defs: dict[str, Any]) -> str:
+    if "$ref" in schema:
+        return _describe(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+
+    if "enum" in schema:
+        return "|".join(json.dumps(value) for value in schema["enum"])
+
+    if "const" in schema:
+        return json.dumps(schema["const"])
+
+    if "anyOf" in schema:
+        options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+        return "|".join(_describe(option, defs) for option in options)
+
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        required = set(schema.get("required", []))
+        fields = ",".join(
+            f"{name}{'' if name in required else '?'}:{_describe(field, defs)}"
+            for name, field in schema.get("properties", {}).items()
+        )
+        return "{" + fields + "}"
+
+    if schema_type == "array":
+        return "[" + _describe(schema.get("items", {}), defs) + "]"
+
+    return _JSON_TYPES.get(schema_type, "any")
+
+
+def compact_schema(model: type[BaseModel]) -> str:
+    """
+    Describe a model's JSON shape in a terse TypeScript-like notation.
+
+    `{title:str,experiences:[{position:str,skills?:[str]}]}` carries the same
+    structure as the full JSON schema at a fraction of the prompt tokens: field
+    titles, descriptions and `$defs` indirection are dropped.
+    """
+    schema = model.model_json_schema()
+    return _describe(schema, schema.get("$defs", {}))
+
+
+def format_instructions(model: type[BaseModel]) -> str:
+    """Compact replacement for `PydanticOutputParser.get_format_instructions()`."""
+    return (
+        "Respond with a single JSON object of this shape "
+        "(key?: optional, [x]: list of x):\n"
+        f"{compact_schema(model)}\n"
+    )
+
+
+def compact_json(model: BaseModel) -> str:
+    """Serialize a model without nulls, defaults (e.g. empty lists) or whitespace."""
+    return model.model_dump_json(exclude_none=True, exclude_defaults=True)
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def prompt_token_report(template: str, **components: str) -> dict[str, int]:
+    """
+    Estimate how many prompt tokens each component contributes.
+
+    `template` is the prompt template with its placeholders; whatever is left of
+    it once the placeholders are removed is reported as `instructions`.
+    """
+    instructions = template
+    for name in components:
+        instructions = instructions.replace("{" + name + "}", "")
+
+    report = {"instructions": estimate_tokens(instructions)}
+    for name, value in components.items():
+        report[name] = estimate_tokens(value)
+    report["total"] = sum(report.values())
+    return report
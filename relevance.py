@@ -0,0 +1,235 @@
+"""
+Local relevance scoring of CV content against a job description.
+
+Bullets and skills are ranked with BM25, using the job description as the query
+and the CV's own bullets and skills as the corpus. This is cheap enough to run
+before every generation, even on CVs with hundreds of bullets, and lets
+low-relevance content be pruned before it reaches the prompt.
+"""
+
+import math
+import re
+from collections import Counter
+from models import CV, CVRelevance, RelevanceFilter
+
+
+# BM25 term frequency saturation and document length normalization
+K1 = 1.5
+B = 0.75
+
+# Keeps terms like "c++", "c#" and "node.js" in one piece
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+_STOPWORDS = frozenset(
+    """
+    a about above after all also an and any are as at be been being both but by
+    can could did do does doing during each for from further had has have having
+    he her here hers him his how i if in into is it its itself just me more most
+    my no nor not of off on once only or other our ours out over own same she
+    should so some such than that the their theirs them then there these they
+    this those through to too under until up very was we were what when where
+    which while who whom why will with would you your yours
+    ability able etc including looking strong using work working experience
+    """.split()
+)
+
+
+def _stem(token: str) -> str:
+    # Just enough to match "developing"/"developed"/"develops" with "develop"
+    if not token.isalpha():
+        return token
+    for suffix in ("ing", "ed"):
+        if token.endswith(suffix) and len(token) > len(suffix) + 3:
+            return token[: -len(suffix)]
+    if token.endswith("s") and not token.endswith("ss") and len(token) > 3:
+        return token[:-1]
+    return token
+
+
+def _words(text: str) -> list[str]:
+    words = []
+    for word in _TOKEN_RE.findall(text.lower()):
+        word = word.rstrip(".")
+        if word and word not in _STOPWORDS and (len(word) > 1 or word in "cr"):
+            words.append(word)
+    return words
+
+
+def tokenize(text: str) -> list[str]:
+    return [_stem(word) for word in _words(text)]
+
+
+def _normalized(scores: list[float]) -> list[float]:
+    best = max(scores, default=0.0)
+    if best <= 0:
+        return [0.0] * len(scores)
+    return [round(score / best, 4) for score in scores]
+
+
+def _split(scores: list[float], counts: list[int]) -> list[list[float]]:
+    groups = []
+    position = 0
+    for count in counts:
+        groups.append(scores[position : position + count])
+        position += count
+    return groups
+
+
+def bm25_scores(documents: list[list[str]], query: list[str]) -> list[float]:
+    """BM25 score of every tokenized document for a tokenized query."""
+    if not documents:
+        return []
+
+    average_length = sum(map(len, documents)) / len(documents) or 1.0
+    document_frequency = Counter()
+    for document in documents:
+        document_frequency.update(set(document))
+
+    # Repeated query terms count, but with diminishing weight
+    query_weights = {
+        term: 1.0 + math.log(count)
+        for term, count in Counter(query).items()
+        if document_frequency[term]
+    }
+    idf = {
+        term: math.log(
+            1.0
+            + (len(documents) - document_frequency[term] + 0.5)
+            / (document_frequency[term] + 0.5)
+        )
+        for term in query_weights
+    }
+
+    scores = []
+    for document in documents:
+        term_frequency = Counter(document)
+        length_norm = K1 * (1.0 - B + B * len(document) / average_length)
+        score = 0.0
+        for term, weight in query_weights.items():
+            frequency = term_frequency.get(term)
+            if frequency:
+                score += (
+                    weight
+                    * idf[term]
+                    * frequency
+                    * (K1 + 1.0)
+                    / (frequency + length_norm)
+                )
+        scores.append(score)
+    return scores
+
+
+def score_cv(cv: CV, job_description: str) -> CVRelevance:
+    """
+    Score every bullet and skill of `cv` against the job description.
+
+    Bullets and skills are ranked in one corpus but normalized separately, so
+    the best bullet and the best skill both score 1.
+    """
+    query = tokenize(job_description)
+
+    bullet_documents = []
+    bullet_counts = {"experiences": [], "volunteer_work": []}
+    for section, entries in (
+        ("experiences", cv.experiences),
+        ("volunteer_work", cv.volunteer_work),
+    ):
+        for entry in entries:
+            # The position gives short bullets some context
+            position = tokenize(entry.position)
+            bullet_documents.extend(
+                tokenize(bullet) + position for bullet in entry.bullets
+            )
+            bullet_counts[section].append(len(entry.bullets))
+
+    skill_documents = [
+        tokenize(skill) for category in cv.skills for skill in category.skills
+    ]
+
+    scores = bm25_scores(bullet_documents + skill_documents, query)
+    bullet_scores = _normalized(scores[: len(bullet_documents)])
+    skill_scores = _normalized(scores[len(bullet_documents) :])
+    experience_scores = _split(
+        bullet_scores[: sum(bullet_counts["experiences"])],
+        bullet_counts["experiences"],
+    )
+    volunteer_scores = _split(
+        bullet_scores[sum(bullet_counts["experiences"]) :],
+        bullet_counts["volunteer_work"],
+    )
+
+    # Report matches as the job description spells them, not as stems
+    cv_terms = {
+        term for document in bullet_documents + skill_documents for term in document
+    }
+    matched_terms = {}
+    for word in _words(job_description):
+        if _stem(word) in cv_terms:
+            matched_terms.setdefault(_stem(word), word)
+
+    return CVRelevance(
+        experiences=experience_scores,
+        volunteer_work=volunteer_scores,
+        skills=_split(skill_scores, [len(category.skills) for category in cv.skills]),
+        matched_terms=sorted(matched_terms.values()),
+    )
+
+
+def _filter_bullets(
+    bullets: list[str], scores: list[float], settings: RelevanceFilter
+) -> list[str]:
+    if not bullets:
+        return bullets
+
+    ranked = sorted(range(len(bullets)), key=lambda i: scores[i], reverse=True)
+    # The best bullet always stays, so no entry is left empty
+    kept = [ranked[0]] + [i for i in ranked[1:] if scores[i] >= settings.min_score]
+    if settings.max_bullets is not None:
+        kept = kept[: settings.max_bullets]
+    if not settings.reorder:
+        kept.sort()
+    return [bullets[i] for i in kept]
+
+
+def filter_cv(cv: CV, relevance: CVRelevance, settings: RelevanceFilter) -> CV:
+    """
+    Drop bullets and skills scoring below `settings.min_score`, keep at most
+    `settings.max_bullets` bullets per entry, and optionally put the most
+    relevant bullets first. Returns a copy; `cv` itself is not changed.
+    """
+    experiences = [
+        entry.model_copy(
+            update={"bullets": _filter_bullets(entry.bullets, scores, settings)}
+        )
+        for entry, scores in zip(cv.experiences, relevance.experiences)
+    ]
+    volunteer_work = [
+        entry.model_copy(
+            update={"bullets": _filter_bullets(entry.bullets, scores, settings)}
+        )
+        for entry, scores in zip(cv.volunteer_work, relevance.volunteer_work)
+    ]
+
+    skills = []
+    for category, scores in zip(cv.skills, relevance.skills):
+        kept = [
+            skill
+            for skill, score in zip(category.skills, scores)
+            if score >= settings.min_score
+        ]
+        if kept:
+            skills.append(category.model_copy(update={"skills": kept}))
+
+    return cv.model_copy(
+        update={
+            "experiences": experiences,
+            "volunteer_work": volunteer_work,
+            # Never leave the CV without skills
+            "skills": skills or cv.skills,
+        }
+    )
+
+
+def prune_cv(cv: CV, job_description: str, settings: RelevanceFilter) -> CV:
+    """Score `cv` against the job description and filter it in one step."""
+    return filter_cv(cv, score_cv(cv, job_description), settings)
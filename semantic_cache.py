@@ -0,0 +1,234 @@
+"""
+Near-duplicate lookup of previously tailored CVs by job description.
+
+Job descriptions are reduced to MinHash signatures over word shingles (one hash
+per shingle, spread over bins), which estimate the Jaccard similarity of two
+texts. Signatures are split into bands for locality-sensitive hashing, so a
+query only compares against entries sharing at least one band bucket, found
+through an SQLite index. Reposts that differ in boilerplate score high;
+unrelated postings are never even compared.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from threading import Lock
+from pydantic import BaseModel, Field
+from cache import CACHE_ROOT
+from models import CVWithPersonalInfo
+
+
+SEMANTIC_CACHE_PATH = CACHE_ROOT / "semantic_cache.sqlite3"
+
+# At or above this similarity a stored CV is returned instead of generating
+REUSE_THRESHOLD = 0.9
+# At or above this similarity a stored CV is offered as a starting point
+WARM_START_THRESHOLD = 0.6
+
+NUM_BINS = 128
+ROWS_PER_BAND = 4
+SHINGLE_SIZE = 3
+DEFAULT_MAX_ENTRIES = 50_000
+
+_EMPTY_BIN = 2**64
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    context TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    job_description TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    cv_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_created ON entries (created_at);
+
+CREATE TABLE IF NOT EXISTS bands (
+    bucket INTEGER NOT NULL,
+    entry_id INTEGER NOT NULL REFERENCES entries (id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS bands_bucket ON bands (bucket);
+CREATE INDEX IF NOT EXISTS bands_entry ON bands (entry_id);
+"""
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def signature(text: str) -> list[int]:
+    """MinHash signature of the word shingles of `text` (one-permutation hashing)."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {
+            " ".join(words[i : i + SHINGLE_SIZE])
+            for i in range(len(words) - SHINGLE_SIZE + 1)
+        }
+
+    bins = [_EMPTY_BIN] * NUM_BINS
+    for shingle in shingles:
+        value = _hash64(shingle.encode("utf-8"))
+        index = value % NUM_BINS
+        value //= NUM_BINS
+        if value < bins[index]:
+            bins[index] = value
+
+    # Short texts leave bins empty; borrow from the next filled bin so that
+    # equal texts still get equal signatures
+    filled = [value for value in bins if value != _EMPTY_BIN]
+    if filled and len(filled) < NUM_BINS:
+        # Walking backwards, `nearest` is the next filled bin to the right, wrapping
+        nearest = filled[0]
+        for i in range(NUM_BINS - 1, -1, -1):
+            if bins[i] != _EMPTY_BIN:
+                nearest = bins[i]
+            else:
+                bins[i] = nearest ^ (i * 0x9E3779B97F4A7C15 % 2**57)
+    return bins
+
+
+def similarity(a: list[int], b: list[int]) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_BINS
+
+
+def _buckets(context: str, sig: list[int]) -> list[int]:
+    prefix = context.encode("utf-8")
+    buckets = []
+    for band, start in enumerate(range(0, NUM_BINS, ROWS_PER_BAND)):
+        rows = array("Q", sig[start : start + ROWS_PER_BAND]).tobytes()
+        # SQLite integers are signed 64-bit
+        buckets.append(_hash64(prefix + bytes([band]) + rows) >> 1)
+    return buckets
+
+
+class SemanticMatch(BaseModel):
+    similarity: float = Field(..., title="Estimated Similarity (0-1)")
+    job_description: str = Field(..., title="Job Description")
+    created_at: float = Field(..., title="Created At (unix time)")
+    cv: CVWithPersonalInfo = Field(..., title="Tailored CV")
+
+
+class SemanticCache:
+    """
+    Persistent index of tailored CVs by the job description they were tailored to.
+
+    Entries are only matched within the same `context`, a key for everything
+    else that shaped the CV (base CV, user story, model).
+    """
+
+    def __init__(
+        self,
+        path: str | Path = SEMANTIC_CACHE_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute("PRAGMA foreign_keys = ON")
+            self._local.connection = connection
+        return connection
+
+    def add(
+        self, context: str, job_description: str, cv: CVWithPersonalInfo
+    ) -> None:
+        sig = signature(job_description)
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN")
+            entry_id = connection.execute(
+                "INSERT INTO entries (context, created_at, job_description, "
+                "signature, cv_json) VALUES (?, ?, ?, ?, ?)",
+                (
+                    context,
+                    time.time(),
+                    job_description,
+                    array("Q", sig).tobytes(),
+                    cv.model_dump_json(),
+                ),
+            ).lastrowid
+            connection.executemany(
+                "INSERT INTO bands (bucket, entry_id) VALUES (?, ?)",
+                [(bucket, entry_id) for bucket in _buckets(context, sig)],
+            )
+            if entry_id % 100 == 0:
+                self._trim()
+
+    def _trim(self) -> None:
+        self._connection().execute(
+            "DELETE FROM entries WHERE id IN ("
+            "SELECT id FROM entries ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def query(
+        self,
+        context: str,
+        job_description: str,
+        min_similarity: float = WARM_START_THRESHOLD,
+    ) -> SemanticMatch | None:
+        """The most similar stored entry at or above `min_similarity`, if any."""
+        sig = signature(job_description)
+        buckets = _buckets(context, sig)
+        connection = self._connection()
+
+        placeholders = ",".join("?" * len(buckets))
+        rows = connection.execute(
+            "SELECT id, signature FROM entries WHERE id IN ("
+            f"SELECT entry_id FROM bands WHERE bucket IN ({placeholders})) "
+            "AND context = ?",
+            (*buckets, context),
+        ).fetchall()
+
+        best_id, best_similarity = None, min_similarity
+        for entry_id, blob in rows:
+            score = similarity(sig, array("Q", blob).tolist())
+            if score >= best_similarity:
+                best_id, best_similarity = entry_id, score
+        if best_id is None:
+            return None
+
+        job_description, created_at, cv_json = connection.execute(
+            "SELECT job_description, created_at, cv_json FROM entries WHERE id = ?",
+            (best_id,),
+        ).fetchone()
+        return SemanticMatch(
+            similarity=best_similarity,
+            job_description=job_description,
+            created_at=created_at,
+            cv=CVWithPersonalInfo.model_validate_json(cv_json),
+        )
+
+    def __len__(self) -> int:
+        row = self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()
+        return row[0]
+
+
+_semantic_cache: SemanticCache | None = None
+_semantic_cache_lock = Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Return the process-wide semantic cache."""
+    global _semantic_cache
+
+    with _semantic_cache_lock:
+        if _semantic_cache is None:
+            _semantic_cache = SemanticCache()
+    return _semantic_cache
@@ -0,0 +1,66 @@
+"""
+Validated JSON loading and dumping of the CV models.
+
+JSON is validated straight from text or bytes by pydantic-core, rather than
+through `json.loads` and a dict, and dumped straight to bytes. TypeAdapters for
+types that are not models (such as lists of CVs) are built once per type.
+"""
+
+from functools import cache, lru_cache
+from typing import Any, TypeVar
+from pydantic import BaseModel, TypeAdapter
+from models import CVWithPersonalInfo
+
+
+T = TypeVar("T")
+
+# The base CVs of the last few sessions/edits
+CV_CACHE_SIZE = 32
+
+
+@cache
+def type_adapter(type_: Any) -> TypeAdapter:
+    """The TypeAdapter for `type_`, built on first use."""
+    return TypeAdapter(type_)
+
+
+def load_json(data: str | bytes, type_: type[T]) -> T:
+    """Parse and validate JSON into `type_`, a model or any type pydantic supports."""
+    if isinstance(type_, type) and issubclass(type_, BaseModel):
+        return type_.model_validate_json(data)
+    return type_adapter(type_).validate_json(data)
+
+
+def dump_json(
+    value: Any,
+    type_: Any = None,
+    *,
+    indent: int | None = None,
+    exclude_unset: bool = False,
+) -> bytes:
+    """
+    Serialize `value` to UTF-8 JSON. `type_` defaults to the type of `value`,
+    and must be given for containers such as `list[CV]`.
+    """
+    return type_adapter(type(value) if type_ is None else type_).dump_json(
+        value, indent=indent, exclude_unset=exclude_unset
+    )
+
+
+@lru_cache(maxsize=CV_CACHE_SIZE)
+def load_cv(data: str | bytes) -> CVWithPersonalInfo:
+    """
+    Validate a CV from JSON, once per distinct text.
+
+    The same base CV is read several times per app run; the returned instance
+    is shared between callers, so treat it as read-only.
+    """
+    return CVWithPersonalInfo.model_validate_json(data)
+
+
+def format_cv_json(data: str | bytes) -> str:
+    """
+    Validate CV JSON and indent it for editing, keeping only the fields that were
+    given. Raises pydantic.ValidationError if it is not a valid CV.
+    """
+    return dump_json(load_cv(data), indent=2, exclude_unset=True).decode("utf-8")
@@ -1,122 +1,251 @@
 import streamlit as st
 import streamlit.components.v1 as components
 from pathlib import Path
+import hashlib
 import json
+import threading
+import time
 import uuid
-from models import CVWithPersonalInfo
-from cv_generator import generate_cv
+from functools import partial
+from models import CV, CVWithPersonalInfo, RelevanceFilter
+from cv_generator import find_similar_cv, generate_cv, stream_cv
+from jobs import Job, get_scheduler
+from llm import DEFAULT_MODEL_NAME, warm_up_llm
 from cv_analyzer import analyze_cv_file
-from cv_renderer import render_cv_template
+from cv_renderer import render_cv_sections, render_cv_to_string
+from cv_pdf import get_pdf_renderer, pdf_export_available
+from history import get_history_store
+from instrumentation import configure_from_env
+from persistence import DebouncedWriter, read_cached
+from pydantic import ValidationError
+from relevance import score_cv
+from semantic_cache import REUSE_THRESHOLD
+from serialization import format_cv_json, load_cv
 from text import TRANSLATIONS
 
 
 # ========================== Constants ==========================
 CV_FILE_PATH = Path("cv.json")
 USER_STORY_FILE_PATH = Path("user_story.txt")
+PREVIEW_CACHE_SIZE = 5
 
 
 # ========================== Helper Functions ==========================
 
 
+def _pretty_json(text: str) -> str:
+    # A CV file that does not validate is still shown, so it can be fixed
+    try:
+        return format_cv_json(text)
+    except ValidationError:
+        return json.dumps(json.loads(text), indent=2, ensure_ascii=False)
+
+
 def load_cv_data() -> str:
-    """Load CV data from file and return as formatted JSON string."""
+    """Load this session's CV data and return as formatted JSON string.
+
+    Sessions without a saved CV of their own start from the shared CV file."""
     try:
-        if CV_FILE_PATH.exists():
-            with open(CV_FILE_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return json.dumps(data, indent=2, ensure_ascii=False)
-        return ""
+        cv_json = get_history_store().latest_base_cv(st.session_state.session_id)
+        if cv_json is not None:
+            return cv_json
+        # Only re-parses and re-formats the file when it changed on disk
+        return read_cached(CV_FILE_PATH, _pretty_json) or ""
     except Exception as e:
         st.error(f"{st.session_state.translate['cv_load_error']}: {str(e)}")
         return ""
 
 
 def save_cv_data(cv_json_str: str) -> bool:
-    """Save CV data to file from JSON string."""
+    """Save CV data for this session from JSON string, if it is a valid CV."""
     try:
-        cv_data = json.loads(cv_json_str)
-        with open(CV_FILE_PATH, "w", encoding="utf-8") as f:
-            json.dump(cv_data, f, indent=2, ensure_ascii=False)
+        cv_json = format_cv_json(cv_json_str)
+        if cv_json != load_cv_data():
+            get_history_store().save_base_cv(st.session_state.session_id, cv_json)
         return True
     except Exception as e:
         st.error(f"{st.session_state.translate['cv_save_error']}: {str(e)}")
         return False
 
 
+def _save_user_story_revision(session_id: str, story: str) -> None:
+    get_history_store().save_user_story(session_id, story)
+
+
+@st.cache_resource
+def get_user_story_writer() -> DebouncedWriter:
+    """Debounces user story autosaves, keyed by session id."""
+    return DebouncedWriter(write_fn=_save_user_story_revision)
+
+
 def load_user_story() -> str:
-    """Load user story from file."""
+    """Load this session's user story, including edits that are not written yet."""
     try:
-        if USER_STORY_FILE_PATH.exists():
-            with open(USER_STORY_FILE_PATH, "r", encoding="utf-8") as f:
-                return f.read()
-        return ""
+        session_id = st.session_state.session_id
+        story = get_user_story_writer().pending(session_id)
+        if story is None:
+            story = get_history_store().latest_user_story(session_id)
+        if story is None:
+            story = read_cached(USER_STORY_FILE_PATH, str)
+        return story or ""
     except Exception as e:
         st.error(f"{st.session_state.translate['user_story_load_error']}: {str(e)}")
         return ""
 
 
 def save_user_story(story: str) -> bool:
-    """Save user story to file."""
+    """Save user story for this session once typing pauses."""
     try:
-        with open(USER_STORY_FILE_PATH, "w", encoding="utf-8") as f:
-            f.write(story)
+        get_user_story_writer().write(st.session_state.session_id, story)
         return True
     except Exception as e:
         st.error(f"{st.session_state.translate['user_story_save_error']}: {str(e)}")
         return False
 
 
-def process_uploaded_cv(uploaded_file):
-    """Process uploaded CV file - to be implemented."""
-    # TODO: Implement CV file processing
-    pass
+@st.cache_resource
+def start_llm_warm_up() -> threading.Thread:
+    """Create and preload the shared LLM once per server process, in the background."""
+    thread = threading.Thread(target=warm_up_llm, daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_resource
+def start_metrics_exporters() -> bool:
+    """Enable the metrics log and endpoint configured in the environment, once per process."""
+    configure_from_env()
+    return True
+
+
+def process_uploaded_cv(uploaded_file) -> bool:
+    """Parse an uploaded CV file from its in-memory buffer and save it as the CV data."""
+    try:
+        parsed_cv = analyze_cv_file(uploaded_file, uploaded_file.name)
+        return save_cv_data(parsed_cv.model_dump_json())
+    except Exception as e:
+        st.error(f"{st.session_state.translate['upload_error']}: {str(e)}")
+        return False
+
+
+def _run_generation_job(
+    job: Job,
+    base_cv: CVWithPersonalInfo,
+    job_description: str,
+    user_story: str,
+    use_cache: bool,
+    by_sections: bool,
+    relevance_filter: RelevanceFilter | None,
+    warm_start: CVWithPersonalInfo | None,
+) -> CVWithPersonalInfo:
+    """Generate a tailored CV and record it in the session's history.
+
+    Runs on a scheduler worker thread, so no `st` calls."""
+    start = time.perf_counter()
+    timings = {}
+
+    # Generate tailored CV, publishing each section as soon as it is complete
+    if by_sections:
+        job.check_cancelled()
+        tailored_cv = generate_cv(
+            base_cv,
+            job_description,
+            user_story,
+            use_cache=use_cache,
+            by_sections=True,
+            relevance_filter=relevance_filter,
+            warm_start=warm_start,
+        )
+    else:
+        tailored_cv = None
+        for update in stream_cv(
+            base_cv,
+            job_description,
+            user_story,
+            use_cache=use_cache,
+            relevance_filter=relevance_filter,
+            warm_start=warm_start,
+        ):
+            job.check_cancelled()
+            if isinstance(update, CVWithPersonalInfo):
+                tailored_cv = update
+            else:
+                timings.setdefault("first_section", time.perf_counter() - start)
+                completed_sections = len(update.keys() & CV.model_fields.keys())
+                job.report(completed_sections / len(CV.model_fields), update)
+
+    timings["total"] = time.perf_counter() - start
+    get_history_store().add_generation(
+        session_id=job.session_id,
+        job_description=job_description,
+        model=job.model_key,
+        cv=tailored_cv,
+        timings=timings,
+    )
+
+    return tailored_cv
 
 
-def generate_tailored_cv(job_description: str, user_input: str):
-    """Generate tailored CV based on job description and user input."""
+def start_generation_job(
+    job_description: str,
+    user_input: str,
+    use_cache: bool = True,
+    by_sections: bool = False,
+    relevance_filter: RelevanceFilter | None = None,
+    warm_start: CVWithPersonalInfo | None = None,
+) -> str | None:
+    """Queue a tailored CV generation for this session and return the job id."""
     try:
-        # Load CV data from file
-        with open(CV_FILE_PATH, "r", encoding="utf-8") as f:
-            cv_data = json.load(f)
-        
-        # Parse into pydantic model
-        
-        base_cv = CVWithPersonalInfo(**cv_data)
-        
+        # Load and validate this session's CV data
+        base_cv = load_cv(load_cv_data())
+
         # Combine system prompt with user story if available
         user_story = load_user_story()
-        
-        # Generate tailored CV
-        tailored_cv = generate_cv(base_cv, job_description, user_story)
-        
-        # Ensure temp folder exists
-        temp_folder = Path("temp")
-        temp_folder.mkdir(exist_ok=True)
-        
-        # Save generated CV to temp folder
-        output_path = temp_folder / "tailored_cv.json"
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(tailored_cv.model_dump(), f, indent=2, ensure_ascii=False)
-        
-        # Render HTML version with random filename
-        random_filename = f"cv_{uuid.uuid4().hex[:8]}.html"
-        html_output_path = temp_folder / random_filename
-        render_cv_template(tailored_cv, html_output_path)
-        
-        st.success(f"{st.session_state.translate.get('generate_success', 'CV generated successfully!')}")
-        st.info(f"Saved JSON to: {output_path}")
-        st.info(f"Saved HTML to: {html_output_path}")
-        
-        # Display the generated CV in iframe
-        st.subheader("CV Preview")
-        
-        # Read the HTML content
-        with open(html_output_path, "r", encoding="utf-8") as f:
-            html_content = f.read()
-        
-        # Display iframe with the CV
-        components.html(
-            f"""
+
+        return get_scheduler().submit(
+            st.session_state.session_id,
+            partial(
+                _run_generation_job,
+                base_cv=base_cv,
+                job_description=job_description,
+                user_story=user_story,
+                use_cache=use_cache,
+                by_sections=by_sections,
+                relevance_filter=relevance_filter,
+                warm_start=warm_start,
+            ),
+            model_key=DEFAULT_MODEL_NAME,
+        )
+    except Exception as e:
+        st.error(f"Error generating CV: {str(e)}")
+        return None
+
+
+@st.fragment(run_every=1.0)
+def render_generation_progress(job_id: str, translate):
+    """Poll a running generation job, showing its progress and the sections done so far."""
+    scheduler = get_scheduler()
+    job = scheduler.get(job_id, st.session_state.session_id)
+    if job is None or job.done:
+        # Let the full app pick up the result
+        st.rerun()
+
+    if job.status == "running":
+        status_text = translate["job_running"]
+    else:
+        status_text = translate["job_queued"]
+    st.progress(job.progress, text=status_text)
+
+    if st.button(translate["job_cancel_button"], key=f"cancel_{job_id}"):
+        scheduler.cancel(job_id, st.session_state.session_id)
+
+    if job.partial:
+        components.html(render_cv_sections(job.partial), height=800, scrolling=True)
+
+
+def _preview_document(html_content: str) -> str:
+    """Wrap a rendered CV in the preview iframe with a print button."""
+    return f"""
             <div style="border: 1px solid #ccc; border-radius: 5px; overflow: hidden;">
                 <div style="background-color: #f0f0f0; padding: 10px; border-bottom: 1px solid #ccc;">
                     <button onclick="printCV()" style="
@@ -159,17 +288,86 @@ def generate_tailored_cv(job_description: str, user_input: str):
                     iframeWindow.print();
                 }}
             </script>
-            """,
-            height=900,
-            scrolling=True
-        )
-        
+            """
+
+
+def _preview_payload(tailored_cv: CVWithPersonalInfo) -> dict:
+    """
+    Build the preview iframe and JSON view of a CV, memoized in session state.
+
+    Entries are keyed by a hash of the CV's JSON, so reruns triggered by unrelated
+    widgets reuse them instead of re-rendering and re-escaping the document. The
+    PDF is only exported on request and then kept in the same entry.
+    """
+    cv_json = tailored_cv.model_dump_json()
+    cv_hash = hashlib.sha256(cv_json.encode("utf-8")).hexdigest()
+
+    cache = st.session_state.setdefault("preview_cache", {})
+    payload = cache.get(cv_hash)
+    if payload is not None:
+        return payload
+
+    payload = {
+        "document": _preview_document(render_cv_to_string(tailored_cv)),
+        "pdf": None,
+        "json": json.loads(cv_json),
+    }
+    cache[cv_hash] = payload
+    # Only the few most recently shown CVs are worth keeping around
+    while len(cache) > PREVIEW_CACHE_SIZE:
+        del cache[next(iter(cache))]
+    return payload
+
+
+def _export_pdf(tailored_cv: CVWithPersonalInfo) -> bytes | None:
+    """Export a CV to PDF, showing a warning instead if the renderer fails."""
+    try:
+        return get_pdf_renderer().render(tailored_cv).pdf
+    except Exception as e:
+        st.warning(f"{st.session_state.translate['pdf_export_error']}: {str(e)}")
+        return None
+
+
+def show_tailored_cv(tailored_cv: CVWithPersonalInfo, key: str = "current"):
+    """Show a generated CV: preview, PDF export and JSON."""
+    try:
+        payload = _preview_payload(tailored_cv)
+
+        st.success(f"{st.session_state.translate.get('generate_success', 'CV generated successfully!')}")
+
+        # Display the generated CV in iframe
+        st.subheader("CV Preview")
+
+        # Display iframe with the CV
+        components.html(payload["document"], height=900, scrolling=True)
+
+        # Exported on demand, so a slow or broken PDF renderer never holds up
+        # the preview
+        if payload["pdf"] is None and pdf_export_available():
+            if st.button(
+                st.session_state.translate["export_pdf_button"],
+                key=f"export_pdf_{key}",
+            ):
+                with st.spinner(st.session_state.translate["pdf_exporting"]):
+                    payload["pdf"] = _export_pdf(tailored_cv)
+
+        if payload["pdf"] is not None:
+            st.download_button(
+                st.session_state.translate["download_pdf_button"],
+                data=payload["pdf"],
+                file_name="tailored_cv.pdf",
+                mime="application/pdf",
+                key=f"download_pdf_{key}",
+            )
+        elif not pdf_export_available():
+            st.caption(st.session_state.translate["pdf_unavailable"])
+
         # Display the generated CV JSON
         with st.expander("View Generated CV JSON"):
-            st.json(tailored_cv.model_dump())
-        
+            st.json(payload["json"])
+
     except Exception as e:
-        st.error(f"Error generating CV: {str(e)}")
+        st.error(f"Error showing CV: {str(e)}")
 
 
 # ========================== UI Sections ==========================
@@ -214,8 +412,11 @@ def render_upload_section(translate):
 
     if st.button(translate["upload_button"], use_container_width=True):
         if uploaded_file is not None:
-            # TODO: Call process_uploaded_cv function when implemented
-            st.info("Upload processing will be implemented soon")
+            with st.spinner("Parsing CV..."):
+                uploaded = process_uploaded_cv(uploaded_file)
+            if uploaded:
+                st.success(translate["upload_success"])
+                st.rerun()
         else:
             st.warning("Please select a file first")
 
@@ -243,6 +444,134 @@ def render_user_story_section(translate):
             st.success(translate["user_story_save_success"])
 
 
+def render_relevance_section(
+    job_description: str, translate
+) -> RelevanceFilter | None:
+    """Show how relevant each bullet and skill is to the job, and let the user
+    prune by it. Returns the chosen filter, or None to send the whole CV."""
+    with st.expander(translate["relevance_section_title"]):
+        min_score = st.slider(
+            translate["relevance_min_score_label"],
+            min_value=0.0,
+            max_value=1.0,
+            value=0.0,
+            step=0.05,
+            help=translate["relevance_min_score_help"],
+            key="relevance_min_score_input",
+        )
+        max_bullets = st.number_input(
+            translate["relevance_max_bullets_label"],
+            min_value=0,
+            value=0,
+            help=translate["relevance_max_bullets_help"],
+            key="relevance_max_bullets_input",
+        )
+        reorder = st.checkbox(
+            translate["relevance_reorder_label"],
+            value=False,
+            key="relevance_reorder_input",
+        )
+
+        cv_data = load_cv_data()
+        if cv_data and job_description.strip():
+            try:
+                cv = load_cv(cv_data)
+            except ValueError:
+                cv = None
+            if cv is not None:
+                relevance = score_cv(cv, job_description)
+                st.caption(
+                    f"{translate['relevance_matched_terms']}: "
+                    + (", ".join(relevance.matched_terms) or "-")
+                )
+                rows = [
+                    {
+                        translate["relevance_entry_column"]: (
+                            f"{entry.position} @ {entry.company}"
+                        ),
+                        translate["relevance_item_column"]: bullet,
+                        translate["relevance_score_column"]: score,
+                    }
+                    for entries, scores in (
+                        (cv.experiences, relevance.experiences),
+                        (cv.volunteer_work, relevance.volunteer_work),
+                    )
+                    for entry, entry_scores in zip(entries, scores)
+                    for bullet, score in zip(entry.bullets, entry_scores)
+                ] + [
+                    {
+                        translate["relevance_entry_column"]: category.category,
+                        translate["relevance_item_column"]: skill,
+                        translate["relevance_score_column"]: score,
+                    }
+                    for category, scores in zip(cv.skills, relevance.skills)
+                    for skill, score in zip(category.skills, scores)
+                ]
+                score_column = st.column_config.ProgressColumn(
+                    min_value=0.0, max_value=1.0, format="%.2f"
+                )
+                st.dataframe(
+                    rows,
+                    use_container_width=True,
+                    column_config={translate["relevance_score_column"]: score_column},
+                )
+
+    if min_score == 0 and not max_bullets and not reorder:
+        return None
+    return RelevanceFilter(
+        min_score=min_score, max_bullets=max_bullets or None, reorder=reorder
+    )
+
+
+def render_similar_posting_section(
+    job_description: str,
+    relevance_filter: RelevanceFilter | None,
+    use_cache: bool,
+    translate,
+) -> CVWithPersonalInfo | None:
+    """Point out a CV tailored earlier to a similar job description.
+
+    Returns that CV if the user chose to start the generation from it."""
+    cv_data = load_cv_data()
+    if not use_cache or not cv_data or not job_description.strip():
+        return None
+    try:
+        base_cv = load_cv(cv_data)
+    except ValueError:
+        return None
+
+    try:
+        match = find_similar_cv(
+            base_cv, job_description, load_user_story(), relevance_filter
+        )
+    except Exception:
+        # Only a hint; the page and the generation work without it
+        return None
+    if match is None:
+        return None
+
+    if match.similarity >= REUSE_THRESHOLD:
+        st.info(
+            translate["similar_posting_reuse"].format(
+                use_cache_label=translate["use_cache_label"]
+            )
+        )
+        return None
+
+    st.info(
+        translate["similar_posting_found"].format(similarity=f"{match.similarity:.0%}")
+    )
+    if st.button(translate["similar_posting_show_button"], key="similar_show_button"):
+        show_tailored_cv(match.cv, key="similar")
+    if st.checkbox(
+        translate["similar_posting_warm_start_label"],
+        value=False,
+        key="similar_warm_start_input",
+    ):
+        return match.cv
+    return None
+
+
 def render_generate_cv_section(translate):
     """Render the CV generation section."""
     st.subheader(translate["generate_section_title"])
@@ -263,18 +592,89 @@ def render_generate_cv_section(translate):
         key="additional_input",
     )
 
-    # Generate button
+    use_cache = st.checkbox(
+        translate["use_cache_label"],
+        value=True,
+        help=translate["use_cache_help"],
+        key="use_cache_input",
+    )
+
+    by_sections = st.checkbox(
+        translate["by_sections_label"],
+        value=False,
+        help=translate["by_sections_help"],
+        key="by_sections_input",
+    )
+
+    relevance_filter = render_relevance_section(job_description, translate)
+    warm_start = render_similar_posting_section(
+        job_description, relevance_filter, use_cache, translate
+    )
+
+    scheduler = get_scheduler()
+    job_id = st.session_state.get("generation_job_id")
+    job = scheduler.get(job_id, st.session_state.session_id) if job_id else None
+
+    # Generate button, disabled while this session already has a generation in flight
     if st.button(
-        translate["generate_button"], type="primary", use_container_width=True
+        translate["generate_button"],
+        type="primary",
+        use_container_width=True,
+        disabled=job is not None and not job.done,
     ):
         # Validation
-        if not CV_FILE_PATH.exists():
+        if not load_cv_data():
             st.error(translate["generate_error_no_cv"])
         elif not job_description.strip():
             st.error(translate["generate_error_no_job_desc"])
         else:
-            with st.spinner("Generating tailored CV..."):
-                generate_tailored_cv(job_description, user_input)
+            job_id = start_generation_job(
+                job_description,
+                user_input,
+                use_cache,
+                by_sections,
+                relevance_filter,
+                warm_start,
+            )
+            if job_id is not None:
+                st.session_state.generation_job_id = job_id
+                job = scheduler.get(job_id, st.session_state.session_id)
+
+    if job is None:
+        return
+
+    if not job.done:
+        render_generation_progress(job_id, translate)
+    elif job.status == "succeeded":
+        show_tailored_cv(job.result)
+    elif job.status == "failed":
+        st.error(f"Error generating CV: {job.error}")
+    else:
+        st.info(translate["job_cancelled"])
+
+
+def render_history_section(translate):
+    """Render the list of CVs previously generated in this session."""
+    generations = get_history_store().list_generations(st.session_state.session_id)
+    if not generations:
+        return
+
+    with st.expander(translate["history_section_title"]):
+        generation = st.selectbox(
+            translate["history_select_label"],
+            generations,
+            format_func=lambda g: (
+                f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(g.created_at))} · "
+                f"{g.model} · {g.job_description.strip()[:60]}"
+            ),
+            key="history_generation",
+        )
+        if st.button(translate["history_show_button"], key="history_show"):
+            tailored_cv = get_history_store().get_generated_cv(
+                generation.id, st.session_state.session_id
+            )
+            if tailored_cv is not None:
+                show_tailored_cv(tailored_cv, key=f"history_{generation.id}")
 
 
 # ========================== Main App ==========================
@@ -284,6 +684,14 @@ def main():
     # Initialize translation
     translate = TRANSLATIONS["en"]
     st.session_state.translate = translate
+    # The session id lives in the URL so a reload keeps the same CV, story and history
+    if "session_id" not in st.session_state:
+        session_id = st.query_params.get("session") or uuid.uuid4().hex
+        st.session_state.session_id = session_id
+        st.query_params["session"] = session_id
+
+    start_llm_warm_up()
+    start_metrics_exporters()
 
     # Page config
     st.set_page_config(
@@ -312,6 +720,7 @@ def main():
 
     # Bottom section: Generate CV (full width)
     render_generate_cv_section(translate)
+    render_history_section(translate)
 
 
 if __name__ == "__main__":
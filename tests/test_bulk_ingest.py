@@ -0,0 +1,131 @@
+import asyncio
+import json
+from fake_llm import CannedResponder, ReplayChatModel, synthetic_cv
+from bulk_ingest import MANIFEST_NAME, Manifest, ingest
+from cache import DiskCache
+from llm import LLM
+
+
+def _pdf(text: str) -> bytes:
+    """A one-page PDF showing `text`."""
+    content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\n" % (len(objects) + 1)
+    out += b"startxref\n%d\n%%%%EOF\n" % xref
+    return out
+
+
+class _CountingResponder(CannedResponder):
+    def __init__(self, cv):
+        super().__init__(cv)
+        self.parsed = []
+
+    def __call__(self, prompt: str) -> str:
+        if "expert CV parser" in prompt:
+            self.parsed.append(prompt)
+        return super().__call__(prompt)
+
+
+def _llm(tmp_path, model_name: str = "stand-in") -> tuple[LLM, _CountingResponder]:
+    responder = _CountingResponder(synthetic_cv(1, 2))
+    llm = LLM(
+        model_name=model_name,
+        cv_cache=DiskCache(tmp_path / "cache", enabled=False),
+        chat_model=ReplayChatModel(respond=responder),
+    )
+    return llm, responder
+
+
+def _ingest(source, output, llm, **kwargs):
+    return asyncio.run(
+        ingest(source, output, workers=1, llm=llm, verbose=False, **kwargs)
+    )
+
+
+def _source(tmp_path):
+    source = tmp_path / "cvs"
+    (source / "team").mkdir(parents=True)
+    (source / "a.pdf").write_bytes(_pdf("Jane Doe"))
+    (source / "team" / "b.pdf").write_bytes(_pdf("John Doe"))
+    return source
+
+
+def test_rerun_skips_files_already_done(tmp_path):
+    source, output = _source(tmp_path), tmp_path / "out"
+    llm, responder = _llm(tmp_path)
+
+    assert _ingest(source, output, llm) == (2, 0, [])
+    assert (output / "team" / "b.pdf.json").exists()
+    assert len(responder.parsed) == 2
+
+    assert _ingest(source, output, llm) == (0, 2, [])
+    assert len(responder.parsed) == 2
+
+    manifest = Manifest(output / MANIFEST_NAME)
+    assert manifest.files["team/b.pdf"]["status"] == "done"
+    assert manifest.files["team/b.pdf"]["output"] == "team/b.pdf.json"
+
+
+def test_changed_pdf_or_parser_is_parsed_again(tmp_path):
+    source, output = _source(tmp_path), tmp_path / "out"
+    llm, responder = _llm(tmp_path)
+    _ingest(source, output, llm)
+
+    (source / "a.pdf").write_bytes(_pdf("Jane Doe, updated"))
+    assert _ingest(source, output, llm) == (1, 1, [])
+    assert "updated" in responder.parsed[-1]
+
+    other_llm, other_responder = _llm(tmp_path, model_name="other-model")
+    assert other_llm.cv_parser_version != llm.cv_parser_version
+    assert _ingest(source, output, other_llm) == (2, 0, [])
+    assert len(other_responder.parsed) == 2
+
+
+def test_skip_failed_does_not_retry_failures(tmp_path):
+    source, output = _source(tmp_path), tmp_path / "out"
+    (source / "broken.pdf").write_bytes(b"not a pdf")
+    llm, _ = _llm(tmp_path)
+
+    parsed, skipped, failures = _ingest(source, output, llm)
+    assert (parsed, skipped, [name for name, _ in failures]) == (2, 0, ["broken.pdf"])
+    assert Manifest(output / MANIFEST_NAME).files["broken.pdf"]["status"] == "failed"
+
+    parsed, skipped, failures = _ingest(source, output, llm)
+    assert (parsed, skipped, [name for name, _ in failures]) == (0, 2, ["broken.pdf"])
+
+    assert _ingest(source, output, llm, skip_failed=True) == (0, 3, [])
+
+    (source / "broken.pdf").write_bytes(_pdf("Fixed"))
+    assert _ingest(source, output, llm, skip_failed=True) == (1, 2, [])
+
+
+def test_outputs_differing_only_in_case_are_reported(tmp_path):
+    source, output = tmp_path / "cvs", tmp_path / "out"
+    source.mkdir()
+    (source / "A.pdf").write_bytes(_pdf("Jane Doe"))
+    (source / "a.pdf").write_bytes(_pdf("John Doe"))
+    (source / "MANIFEST.pdf").write_bytes(_pdf("Max Doe"))
+    llm, _ = _llm(tmp_path)
+
+    parsed, skipped, failures = _ingest(source, output, llm)
+
+    assert (parsed, skipped) == (2, 0)
+    assert [name for name, _ in failures] == ["a.pdf"]
+    assert "collides with that of A.pdf" in failures[0][1]
+    manifest = json.loads((output / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert sorted(manifest["files"]) == ["A.pdf", "MANIFEST.pdf"]
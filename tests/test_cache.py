@@ -0,0 +1,81 @@
+import os
+import time
+from cache import DiskCache
+
+
+def _age(cache: DiskCache, key: str, seconds: float) -> None:
+    """Make an entry look last used `seconds` ago."""
+    used = time.time() - seconds
+    os.utime(cache._path(key), (used, used))
+
+
+def test_round_trip_and_stats(tmp_path):
+    cache = DiskCache(tmp_path)
+
+    assert cache.get("missing") is None
+    cache.set("key", {"title": "Engineer", "skills": ["Python"]})
+
+    assert cache.get("key") == {"title": "Engineer", "skills": ["Python"]}
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = DiskCache(tmp_path, enabled=False)
+    cache.set("key", 1)
+
+    assert cache.get("key") is None
+    assert not any(tmp_path.iterdir())
+
+
+def test_make_key_separates_parts():
+    assert DiskCache.make_key("ab", "c") != DiskCache.make_key("a", "bc")
+    assert DiskCache.make_key("a", "b") == DiskCache.make_key("a", "b")
+
+
+def test_evicts_least_recently_used_past_max_entries(tmp_path):
+    cache = DiskCache(tmp_path, max_entries=3)
+    for index, key in enumerate(["a", "b", "c"]):
+        cache.set(key, key)
+        _age(cache, key, 100 - index)
+
+    # Reading refreshes "a", which leaves "b" as the least recently used
+    assert cache.get("a") == "a"
+    cache.set("d", "d")
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["a", "c", "d"]
+    assert len(list(tmp_path.glob("*.json"))) == 3
+
+
+def test_evicts_oldest_entries_past_max_bytes(tmp_path):
+    cache = DiskCache(tmp_path)
+    for index, key in enumerate(["a", "b", "c"]):
+        cache.set(key, "x" * 1000)
+        _age(cache, key, 100 - index)
+    entry_size = cache._path("a").stat().st_size
+
+    # Room for two entries only
+    cache.max_bytes = 2 * entry_size + entry_size // 2
+    cache.evict()
+
+    assert sorted(path.stem for path in tmp_path.glob("*.json")) == ["b", "c"]
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = DiskCache(tmp_path, max_age_seconds=60)
+    cache.set("old", 1)
+    cache.set("new", 2)
+    _age(cache, "old", 120)
+
+    cache.evict()
+
+    assert not cache._path("old").exists()
+    assert cache.get("new") == 2
+
+
+def test_expired_entry_is_a_miss(tmp_path):
+    cache = DiskCache(tmp_path, max_age_seconds=-1)
+    cache.set("key", 1)
+
+    assert cache.get("key") is None
+    assert cache.stats()["misses"] == 1
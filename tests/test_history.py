@@ -0,0 +1,93 @@
+import sqlite3
+import time
+from fake_llm import synthetic_cv
+from history import HistoryStore
+
+
+def _pragma(store: HistoryStore, name: str) -> int:
+    return store._connection().execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def _backdate(store: HistoryStore, table: str, seconds: float) -> None:
+    store._connection().execute(
+        f"UPDATE {table} SET created_at = ?", (time.time() - seconds,)
+    )
+
+
+def test_new_store_uses_incremental_auto_vacuum(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3")
+
+    assert _pragma(store, "auto_vacuum") == 2
+    assert _pragma(store, "journal_mode") == "wal"
+
+
+def test_existing_store_is_converted_to_incremental_auto_vacuum(tmp_path):
+    path = tmp_path / "history.sqlite3"
+    connection = sqlite3.connect(path, isolation_level=None)
+    connection.execute("CREATE TABLE legacy (x)")
+    connection.close()
+
+    assert _pragma(HistoryStore(path), "auto_vacuum") == 2
+
+
+def test_trims_revisions_per_session(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3", revisions_per_session=2)
+    for revision in range(4):
+        store.save_user_story("a", f"story {revision}")
+    store.save_user_story("b", "other")
+
+    count = store._connection().execute(
+        "SELECT COUNT(*) FROM user_stories WHERE session_id = 'a'"
+    ).fetchone()[0]
+    assert count == 2
+    assert store.latest_user_story("a") == "story 3"
+    assert store.latest_user_story("b") == "other"
+
+
+def test_generated_cv_is_scoped_to_its_session(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    cv = synthetic_cv(1, 2)
+    generation_id = store.add_generation("a", "Job", "model", cv, {"total": 1.0})
+
+    assert store.get_generated_cv(generation_id, "a") == cv
+    assert store.get_generated_cv(generation_id, "b") is None
+    assert store.list_generations("b") == []
+    assert [g.id for g in store.list_generations("a")] == [generation_id]
+
+
+def test_age_retention_drops_old_rows(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3", max_age_seconds=60)
+    store.save_base_cv("a", "{}")
+    store.save_user_story("a", "old")
+    _backdate(store, "base_cvs", 120)
+    _backdate(store, "user_stories", 120)
+    store.save_user_story("a", "new")
+
+    store.apply_retention()
+
+    assert store.latest_base_cv("a") is None
+    assert store.latest_user_story("a") == "new"
+
+
+def test_size_retention_drops_oldest_generations_and_shrinks_file(tmp_path):
+    path = tmp_path / "history.sqlite3"
+    store = HistoryStore(path, max_bytes=1 << 30)
+    cv = synthetic_cv(5, 8)
+    job_description = "Python engineer " * 500
+    ids = [
+        store.add_generation("a", job_description, "model", cv, {})
+        for _ in range(300)
+    ]
+    store._connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    full_size = path.stat().st_size
+
+    # Generations are deleted oldest first, 100 at a time
+    store.max_bytes = full_size // 2
+    store.apply_retention()
+    store._connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    assert store.size_bytes() <= store.max_bytes
+    assert _pragma(store, "freelist_count") == 0
+    assert path.stat().st_size < full_size // 2
+    remaining = [g.id for g in store.list_generations("a", limit=1000)]
+    assert sorted(remaining) == ids[-100:]
@@ -0,0 +1,115 @@
+import threading
+import time
+from jobs import Job, JobScheduler
+
+
+def _wait(scheduler: JobScheduler, job_id: str, session_id: str = "a") -> Job:
+    job = scheduler.get(job_id, session_id)
+    deadline = time.time() + 5
+    while not job.done and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_job_result_and_progress():
+    scheduler = JobScheduler()
+
+    def fn(job):
+        job.report(0.5, partial="half")
+        return "done"
+
+    job = _wait(scheduler, scheduler.submit("a", fn))
+
+    assert (job.status, job.result, job.partial, job.progress) == (
+        "succeeded",
+        "done",
+        "half",
+        1.0,
+    )
+
+
+def test_failed_job_records_error():
+    def fn(job):
+        raise ValueError("bad input")
+
+    scheduler = JobScheduler()
+    job = _wait(scheduler, scheduler.submit("a", fn))
+
+    assert (job.status, job.error) == ("failed", "bad input")
+
+
+def test_jobs_are_scoped_to_their_session():
+    scheduler = JobScheduler()
+    job_id = scheduler.submit("a", lambda job: None)
+
+    assert scheduler.get(job_id, "b") is None
+    assert scheduler.cancel(job_id, "b") is False
+    assert _wait(scheduler, job_id).status == "succeeded"
+
+
+def test_cancel_running_job_at_next_check():
+    started = threading.Event()
+
+    def fn(job):
+        started.set()
+        while True:
+            job.check_cancelled()
+            time.sleep(0.01)
+
+    scheduler = JobScheduler()
+    job_id = scheduler.submit("a", fn)
+    assert started.wait(5)
+
+    assert scheduler.cancel(job_id, "a") is True
+    assert _wait(scheduler, job_id).status == "cancelled"
+    assert scheduler.cancel(job_id, "a") is False
+
+
+def test_cancel_queued_job_never_runs():
+    release = threading.Event()
+    ran = []
+    scheduler = JobScheduler(max_workers=1)
+    blocker = scheduler.submit("a", lambda job: release.wait(5))
+    queued = scheduler.submit("a", lambda job: ran.append(job.id))
+
+    assert scheduler.cancel(queued, "a") is True
+    release.set()
+
+    assert _wait(scheduler, blocker).status == "succeeded"
+    assert _wait(scheduler, queued).status == "cancelled"
+    assert ran == []
+
+
+def test_per_model_concurrency_limits_running_jobs():
+    running = peak = 0
+    lock = threading.Lock()
+
+    def fn(job):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    scheduler = JobScheduler(max_workers=4, per_model_concurrency=2)
+    job_ids = [scheduler.submit("a", fn, model_key="model") for _ in range(6)]
+    for job_id in job_ids:
+        assert _wait(scheduler, job_id).status == "succeeded"
+
+    assert peak == 2
+
+
+def test_job_waiting_for_model_slot_can_be_cancelled():
+    release = threading.Event()
+    scheduler = JobScheduler(max_workers=2, per_model_concurrency=1)
+    blocker = scheduler.submit("a", lambda job: release.wait(5), model_key="model")
+    waiting = scheduler.submit("a", lambda job: "ran", model_key="model")
+    time.sleep(0.1)
+
+    assert scheduler.get(waiting, "a").status == "queued"
+    assert scheduler.cancel(waiting, "a") is True
+    assert _wait(scheduler, waiting).status == "cancelled"
+    release.set()
+    assert _wait(scheduler, blocker).status == "succeeded"
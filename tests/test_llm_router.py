@@ -0,0 +1,145 @@
+import asyncio
+import time
+import httpx
+import pytest
+from fake_ollama import FakeOllamaServer
+from llm_router import OllamaRouter, endpoints_from_env, is_retryable
+from models import OllamaEndpoint
+from ollama import ResponseError
+from pydantic import ValidationError
+
+MODEL = "stand-in:latest"
+
+
+@pytest.fixture
+def servers():
+    servers = [FakeOllamaServer(lambda prompt: "pong", MODEL).start() for _ in range(2)]
+    yield servers
+    for server in servers:
+        server.stop()
+
+
+def _router(servers, **kwargs) -> OllamaRouter:
+    kwargs.setdefault("health_check_interval", 0)
+    return OllamaRouter(
+        model=MODEL,
+        endpoints=[OllamaEndpoint(url=server.url) for server in servers],
+        **kwargs,
+    )
+
+
+def _healthy(router: OllamaRouter) -> list[bool]:
+    return [stats["healthy"] for stats in router.stats()]
+
+
+def test_endpoints_from_env(monkeypatch):
+    monkeypatch.setenv(
+        "CV_OLLAMA_ENDPOINTS", " http://gpu1:11434=4, ,http://gpu2:11434"
+    )
+
+    assert endpoints_from_env() == [
+        OllamaEndpoint(url="http://gpu1:11434", max_concurrency=4),
+        OllamaEndpoint(url="http://gpu2:11434"),
+    ]
+
+
+def test_is_retryable():
+    assert is_retryable(ConnectionError())
+    assert is_retryable(ResponseError("overloaded", 503))
+    assert is_retryable(ResponseError("model not found", 404))
+    assert not is_retryable(ResponseError("bad request", 400))
+    assert not is_retryable(ValueError())
+
+
+def test_spreads_requests_over_endpoints(servers):
+    router = _router(servers)
+
+    async def batch():
+        return await asyncio.gather(*(router.ainvoke("ping") for _ in range(8)))
+
+    assert all(message.content == "pong" for message in asyncio.run(batch()))
+    assert [server.requests for server in servers] == [4, 4]
+
+
+def test_fails_over_to_a_healthy_endpoint(servers):
+    router = _router(servers)
+    down, up = servers
+    down.stop()
+
+    assert [router.invoke("ping").content for _ in range(3)] == ["pong"] * 3
+    assert asyncio.run(router.ainvoke("ping")).content == "pong"
+    assert "".join(chunk.content for chunk in router.stream("ping")) == "pong"
+
+    assert _healthy(router) == [False, True]
+    assert up.requests == 5
+    assert router.stats()[0]["failures"] == 1
+
+
+def test_restarted_endpoint_rejoins_after_health_check(servers):
+    router = _router(servers)
+    restarted = servers[0]
+    restarted.stop()
+    router.invoke("ping")
+    assert _healthy(router) == [False, True]
+
+    restarted.start()
+    router.check_health()
+
+    assert _healthy(router) == [True, True]
+    router.invoke("ping")
+    assert restarted.requests == 1
+
+
+def test_background_health_check_restores_endpoint(servers):
+    router = _router(servers, health_check_interval=0.05)
+    try:
+        restarted = servers[0]
+        restarted.stop()
+        router.invoke("ping")
+        assert _healthy(router) == [False, True]
+
+        restarted.start()
+        deadline = time.monotonic() + 5
+        while not all(_healthy(router)) and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        assert _healthy(router) == [True, True]
+    finally:
+        router.close()
+
+
+def test_raises_when_every_endpoint_is_down(servers):
+    router = _router(servers, acquire_timeout=30)
+    for server in servers:
+        server.stop()
+
+    start = time.monotonic()
+    # The last endpoint's own error; streamed Ollama requests let httpx's
+    # connection error through
+    with pytest.raises(httpx.ConnectError):
+        router.invoke("ping")
+    assert _healthy(router) == [False, False]
+
+    # Known-down endpoints are not waited for
+    with pytest.raises(ConnectionError, match="None of the Ollama endpoints"):
+        router.invoke("ping")
+    with pytest.raises(ConnectionError, match="None of the Ollama endpoints"):
+        asyncio.run(router.ainvoke("ping"))
+    assert time.monotonic() - start < 5
+
+
+def test_rejects_endpoints_without_the_model(servers):
+    for server in servers:
+        server.stop()
+
+    with pytest.raises(ValueError, match="None of the Ollama endpoints"):
+        _router(servers)
+
+
+def test_does_not_retry_invalid_requests(servers):
+    router = _router(servers)
+
+    with pytest.raises(ValidationError):
+        router.invoke("ping", format="not a schema")
+    assert sum(server.requests for server in servers) == 0
+    assert _healthy(router) == [True, True]
@@ -0,0 +1,113 @@
+import json
+import pytest
+from langchain_core.exceptions import OutputParserException
+from fake_llm import synthetic_cv
+from models import CV, CVHeader
+from output_parsing import (
+    SectionStream,
+    SectionsInvalid,
+    TolerantOutputParser,
+    repair_json,
+    strip_reasoning,
+)
+
+
+def _cv_json() -> str:
+    return synthetic_cv(2, 3).into_cv().model_dump_json()
+
+
+def test_strip_reasoning_removes_think_blocks_and_fences():
+    text = '<think>The user wants JSON.</think>\n```json\n{"a": 1}\n```'
+    assert strip_reasoning(text) == '{"a": 1}'
+
+
+def test_strip_reasoning_drops_unterminated_think_block():
+    assert strip_reasoning("<think>still reasoning when the tokens ran out") == ""
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"a": [1, 2]}',
+        'Here it is: {"a": [1, 2]} Hope this helps!',
+        '{"a": [1, 2,],}',
+        '<think>{"not": "this"}</think>{"a": [1, 2]}',
+    ],
+)
+def test_repair_json_complete_replies(text):
+    assert repair_json(text) == ({"a": [1, 2]}, False)
+
+
+def test_repair_json_reports_truncation():
+    data, truncated = repair_json('{"a": 1, "b": ["did anoth')
+
+    assert truncated
+    assert data == {"a": 1, "b": ["did anoth"]}
+
+
+@pytest.mark.parametrize("text", ["", "No JSON here", '{"a": }'])
+def test_repair_json_rejects_unrecoverable_replies(text):
+    with pytest.raises(OutputParserException):
+        repair_json(text)
+
+
+def test_parser_accepts_repaired_reply():
+    parser = TolerantOutputParser(pydantic_object=CVHeader)
+    header = parser.parse('```json\n{"title": "Engineer", "self_summary": "Hi",}\n```')
+    assert header == CVHeader(title="Engineer", self_summary="Hi")
+
+
+def test_parser_reports_invalid_sections():
+    data = json.loads(_cv_json())
+    data["skills"] = "Python"
+
+    with pytest.raises(SectionsInvalid) as error:
+        TolerantOutputParser(pydantic_object=CV).parse(json.dumps(data))
+
+    assert error.value.fields == ["skills"]
+    assert "skills" not in error.value.data
+    assert error.value.data["title"] == data["title"]
+
+
+def test_parser_rejects_truncated_reply():
+    cv_json = _cv_json()
+    # Cut off inside the second experience's bullets
+    cut = cv_json[: cv_json.index('"bullets"', cv_json.index('"bullets"') + 1) + 20]
+
+    with pytest.raises(SectionsInvalid) as error:
+        TolerantOutputParser(pydantic_object=CV).parse(cut)
+
+    # The cut-off field, then every field the reply never reached
+    assert error.value.fields == [
+        "experiences",
+        "certificates",
+        "languages",
+        "education",
+        "volunteer_work",
+        "skills",
+    ]
+    assert set(error.value.data) == {"title", "self_summary"}
+
+
+def test_parser_rejects_truncated_list():
+    with pytest.raises(OutputParserException):
+        TolerantOutputParser(pydantic_object=CV).parse('[{"title": "Eng')
+
+
+def test_section_stream_yields_completed_sections():
+    cv_json = _cv_json()
+    stream = SectionStream()
+    updates = [
+        update
+        for start in range(0, len(cv_json), 7)
+        if (update := stream.feed(cv_json[start : start + 7]))
+    ]
+
+    # Every update adds sections, and the last one is only known complete
+    # once the closing brace arrives, which the final parse handles
+    assert [list(update) for update in updates][:2] == [
+        ["title"],
+        ["title", "self_summary"],
+    ]
+    assert list(updates[-1]) == list(json.loads(cv_json))[:-1]
+    assert stream.text == cv_json
@@ -0,0 +1,78 @@
+import json
+import os
+import time
+import pytest
+from persistence import DebouncedWriter, atomic_write_text, read_cached
+
+
+def test_atomic_write_replaces_content_without_leftovers(tmp_path):
+    path = tmp_path / "nested" / "state.json"
+    atomic_write_text(path, "old")
+    atomic_write_text(path, "new")
+
+    assert path.read_text(encoding="utf-8") == "new"
+    assert [p.name for p in path.parent.iterdir()] == ["state.json"]
+
+
+def test_atomic_write_keeps_old_content_when_writing_fails(tmp_path, monkeypatch):
+    path = tmp_path / "state.json"
+    atomic_write_text(path, "old")
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        atomic_write_text(path, "new")
+
+    assert path.read_text(encoding="utf-8") == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
+
+
+def test_read_cached_reloads_only_when_file_changes(tmp_path):
+    path = tmp_path / "state.json"
+    calls = []
+
+    def loader(text):
+        calls.append(text)
+        return json.loads(text)
+
+    assert read_cached(path, loader) is None
+
+    path.write_text('{"a": 1}', encoding="utf-8")
+    assert read_cached(path, loader) == {"a": 1}
+    assert read_cached(path, loader) == {"a": 1}
+    assert len(calls) == 1
+
+    path.write_text('{"a": 22}', encoding="utf-8")
+    assert read_cached(path, loader) == {"a": 22}
+    assert len(calls) == 2
+
+
+def test_debounced_writer_collapses_bursts(tmp_path):
+    writes = []
+    writer = DebouncedWriter(delay=0.1, write_fn=lambda k, t: writes.append((k, t)))
+    for text in ("1", "2", "3"):
+        writer.write("a", text)
+    writer.write("b", "x")
+
+    assert writer.pending("a") == "3"
+    time.sleep(0.3)
+
+    assert sorted(writes) == [("a", "3"), ("b", "x")]
+    assert writer.pending("a") is None
+
+
+def test_debounced_writer_flush_writes_pending_now(tmp_path):
+    path = tmp_path / "state.json"
+    writer = DebouncedWriter(delay=60)
+    writer.write(path, "content")
+
+    assert not path.exists()
+    writer.flush(path)
+
+    assert path.read_text(encoding="utf-8") == "content"
+    assert writer.pending(path) is None
+    # The cancelled timer must not write again
+    writer.flush()
+    assert path.read_text(encoding="utf-8") == "content"
@@ -0,0 +1,119 @@
+from models import CV, RelevanceFilter
+from relevance import bm25_scores, filter_cv, prune_cv, score_cv, tokenize
+
+JOB_DESCRIPTION = (
+    "We are looking for a Python engineer to build Kafka data pipelines "
+    "and deploy them with Kubernetes."
+)
+
+
+def _experience(position: str, bullets: list[str]) -> CV.Experience:
+    return CV.Experience(
+        position=position,
+        company="Acme",
+        location="Remote",
+        start_date="2020",
+        end_date="2024",
+        bullets=bullets,
+    )
+
+
+def _cv() -> CV:
+    return CV(
+        title="Software Engineer",
+        self_summary="Engineer.",
+        experiences=[
+            _experience(
+                "Backend Developer",
+                [
+                    "Organized the office holiday party",
+                    "Built Python Kafka data pipelines",
+                    "Deployed services to Kubernetes",
+                ],
+            ),
+            _experience("Barista", ["Made coffee", "Trained new staff"]),
+        ],
+        skills=[
+            CV.Skill(category="Languages", skills=["Python", "COBOL"]),
+            CV.Skill(category="Other", skills=["Latte art"]),
+        ],
+    )
+
+
+def test_tokenize_stems_and_drops_stopwords():
+    assert tokenize("Developing and deployed the C++ services") == [
+        "develop",
+        "deploy",
+        "c++",
+        "service",
+    ]
+
+
+def test_bm25_prefers_rarer_and_repeated_terms():
+    documents = [["python", "python"], ["python"], ["kafka"], ["coffee"]]
+    scores = bm25_scores(documents, ["python", "kafka"])
+
+    assert scores[3] == 0
+    # "kafka" is in fewer documents than "python", so it weighs more
+    assert scores[2] > scores[1]
+    assert scores[0] > scores[1]
+    assert bm25_scores([], ["python"]) == []
+
+
+def test_score_cv_ranks_relevant_bullets_first():
+    relevance = score_cv(_cv(), JOB_DESCRIPTION)
+
+    backend, barista = relevance.experiences
+    assert max(backend) == 1.0
+    assert backend[1] > backend[2] > backend[0]
+    assert barista == [0.0, 0.0]
+    assert relevance.skills == [[1.0, 0.0], [0.0]]
+    # As the job description spells them
+    assert relevance.matched_terms == [
+        "data",
+        "deploy",
+        "kafka",
+        "kubernetes",
+        "pipelines",
+        "python",
+    ]
+
+
+def test_score_cv_without_matches_scores_zero():
+    relevance = score_cv(_cv(), "Florist wanted")
+
+    assert all(score == 0 for scores in relevance.experiences for score in scores)
+    assert relevance.matched_terms == []
+
+
+def test_filter_keeps_best_bullet_and_order():
+    cv = _cv()
+    pruned = filter_cv(
+        cv, score_cv(cv, JOB_DESCRIPTION), RelevanceFilter(min_score=0.5)
+    )
+
+    backend, barista = pruned.experiences
+    assert backend.bullets == cv.experiences[0].bullets[1:]
+    # Nothing is relevant, but an entry is never emptied
+    assert len(barista.bullets) == 1
+    assert pruned.skills == [CV.Skill(category="Languages", skills=["Python"])]
+    # The input is not modified
+    assert len(cv.experiences[0].bullets) == 3
+
+
+def test_filter_limits_and_reorders_bullets():
+    pruned = prune_cv(
+        _cv(), JOB_DESCRIPTION, RelevanceFilter(max_bullets=2, reorder=True)
+    )
+
+    assert pruned.experiences[0].bullets == [
+        "Built Python Kafka data pipelines",
+        "Deployed services to Kubernetes",
+    ]
+
+
+def test_filter_never_removes_every_skill():
+    cv = _cv()
+    pruned = prune_cv(cv, "Florist wanted", RelevanceFilter(min_score=0.5))
+
+    assert pruned.skills == cv.skills
@@ -0,0 +1,77 @@
+import pytest
+from fake_llm import synthetic_cv
+from semantic_cache import NUM_BINS, SemanticCache, signature, similarity
+
+POSTING = (
+    "Senior Python engineer to design and operate distributed data pipelines "
+    "on Kafka and Kubernetes. You will mentor two engineers, own the on-call "
+    "rotation and work with product on the roadmap for the analytics platform."
+)
+REPOST = POSTING + " Apply by the end of the month."
+UNRELATED = (
+    "Pastry chef for a busy bakery. Early mornings, laminated doughs, "
+    "wedding cakes and training apprentices in a small friendly team."
+)
+
+
+@pytest.fixture
+def cache(tmp_path) -> SemanticCache:
+    return SemanticCache(tmp_path / "semantic.sqlite3")
+
+
+def test_signature_is_deterministic_and_case_insensitive():
+    assert signature(POSTING) == signature(POSTING.upper())
+    assert len(signature("Python")) == NUM_BINS
+    assert signature("Python") == signature("python")
+
+
+def test_similarity_orders_postings():
+    posting = signature(POSTING)
+
+    assert similarity(posting, posting) == 1.0
+    assert similarity(posting, signature(REPOST)) > 0.8
+    assert similarity(posting, signature(UNRELATED)) < 0.1
+
+
+def test_query_returns_most_similar_entry(cache):
+    cv = synthetic_cv(1, 1)
+    cache.add("context", UNRELATED, cv)
+    cache.add("context", REPOST, cv)
+
+    match = cache.query("context", POSTING, min_similarity=0.5)
+
+    assert match is not None
+    assert match.job_description == REPOST
+    assert match.cv == cv
+    assert cache.query("context", "Florist wanted", min_similarity=0.5) is None
+
+
+def test_query_threshold_is_inclusive(cache):
+    cache.add("context", REPOST, synthetic_cv(1, 1))
+    score = similarity(signature(POSTING), signature(REPOST))
+
+    assert cache.query("context", POSTING, min_similarity=score).similarity == score
+    assert cache.query("context", POSTING, min_similarity=score + 1 / NUM_BINS) is None
+
+
+def test_entries_only_match_within_their_context(cache):
+    cache.add("base cv A", POSTING, synthetic_cv(1, 1))
+
+    assert cache.query("base cv B", POSTING, min_similarity=0.0) is None
+    assert cache.query("base cv A", POSTING, min_similarity=1.0) is not None
+
+
+def test_trims_oldest_entries(tmp_path):
+    cache = SemanticCache(tmp_path / "semantic.sqlite3", max_entries=10)
+    cv = synthetic_cv(1, 1)
+    # Trimming runs every 100 additions
+    for index in range(100):
+        cache.add("context", f"{POSTING} Requisition {index}.", cv)
+
+    def stored(index: int) -> bool:
+        posting = f"{POSTING} Requisition {index}."
+        return cache.query("context", posting, min_similarity=1.0) is not None
+
+    assert len(cache) == 10
+    assert stored(99)
+    assert not stored(0)
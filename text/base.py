@@ -34,7 +34,39 @@ class TranslationKeys(TypedDict):
     job_description_placeholder: str
     user_input_label: str
     user_input_placeholder: str
+    use_cache_label: str
+    use_cache_help: str
+    by_sections_label: str
+    by_sections_help: str
     generate_button: str
     generate_error_no_cv: str
     generate_error_no_job_desc: str
+    download_pdf_button: str
+    export_pdf_button: str
+    pdf_exporting: str
+    pdf_export_error: str
+    job_queued: str
+    job_running: str
+    job_cancel_button: str
+    job_cancelled: str
+    relevance_section_title: str
+    relevance_min_score_label: str
+    relevance_min_score_help: str
+    relevance_max_bullets_label: str
+    relevance_max_bullets_help: str
+    relevance_reorder_label: str
+    relevance_matched_terms: str
+    relevance_entry_column: str
+    relevance_item_column: str
+    relevance_score_column: str
+    similar_posting_reuse: str
+    similar_posting_found: str
+    similar_posting_show_button: str
+    similar_posting_warm_start_label: str
+
+    # History Section
+    history_section_title: str
+    history_select_label: str
+    history_show_button: str
+    pdf_unavailable: str
     
\ No newline at end of file
@@ -34,8 +34,46 @@ en_translations: TranslationKeys = {
     "job_description_placeholder": "Paste the job description here...",
     "user_input_label": "Additional Instructions (Optional)",
     "user_input_placeholder": "Any specific requirements or customizations for this CV...",
+    "use_cache_label": "Reuse previous results for identical or nearly identical input",
+    "use_cache_help": "Uncheck to force a fresh generation even if this CV was already tailored to the same or a nearly identical job description.",
+    "by_sections_label": "Tailor sections in parallel",
+    "by_sections_help": "Tailor the summary, each experience and the skills with separate smaller prompts. Faster and less prone to truncation on long CVs, but without a live preview.",
     "generate_button": "✨ Generate CV",
     "generate_error_no_cv": "⚠️ Please save your CV data first",
     "generate_error_no_job_desc": "⚠️ Please provide a job description",
+    "download_pdf_button": "📥 Download PDF",
+    "export_pdf_button": "📄 Export PDF",
+    "pdf_exporting": "Exporting PDF...",
+    "pdf_export_error": "PDF export failed, use the print button instead",
+    "job_queued": "Waiting for the model to become available...",
+    "job_running": "Generating tailored CV...",
+    "job_cancel_button": "✖️ Cancel",
+    "job_cancelled": "CV generation was cancelled.",
+    "relevance_section_title": "🎯 Relevance to the job description",
+    "relevance_min_score_label": "Minimum relevance",
+    "relevance_min_score_help": "Bullets and skills scoring below this are left out of the prompt. The best bullet of every experience is always kept.",
+    "relevance_max_bullets_label": "Bullets kept per experience (0 = all)",
+    "relevance_max_bullets_help": "Keep only the most relevant bullets of each experience, for a shorter prompt and a faster generation.",
+    "relevance_reorder_label": "Put the most relevant bullets first",
+    "relevance_matched_terms": "Matched terms",
+    "relevance_entry_column": "Entry",
+    "relevance_item_column": "Bullet / skill",
+    "relevance_score_column": "Relevance",
+    "similar_posting_reuse": (
+        "A CV was already tailored to a nearly identical job description "
+        "and will be reused. Uncheck '{use_cache_label}' to generate a new one."
+    ),
+    "similar_posting_found": (
+        "A CV was tailored earlier to a similar job description "
+        "({similarity} similar)."
+    ),
+    "similar_posting_show_button": "Show it",
+    "similar_posting_warm_start_label": "Start from that CV instead of the base CV",
+
+    # History Section
+    "history_section_title": "🕘 Previously Generated CVs",
+    "history_select_label": "Generated CV",
+    "history_show_button": "Show",
+    "pdf_unavailable": "PDF export is unavailable: install playwright to enable it, or use the print button.",
 }
 